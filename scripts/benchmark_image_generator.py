@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark generate_images.py's scheduling against an offline mock backend.
+
+Runs the real worker pool, QuotaScheduler, journal and post-processing on synthetic
+events in a scratch directory, with image_backends.MockBackend standing in for
+Gemini, then reports:
+
+  images/minute       successful images per minute of wall time
+  retry overhead      API calls spent on anything but a successful image, per image
+  quota utilisation   accepted calls as a share of what the mock server's per-minute
+                      limit would admit over the run (a full window up front, then
+                      the limit per minute)
+
+No API key, network or repo files are touched.
+
+Usage:
+  python scripts/benchmark_image_generator.py
+  python scripts/benchmark_image_generator.py --events 120 --workers 8 --rpm 90 --server-rpm 60
+  python scripts/benchmark_image_generator.py --latency 1 --error-rate 0.05 --quota-rate 0.1
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import generate_images as gen
+from image_backends import MockBackend
+
+CATEGORIES = list(gen.CATEGORY_STYLE)
+
+
+def synthetic_events(count: int) -> list[dict]:
+    return [
+        {
+            "name": f"bench-{i}",
+            "friendly_name": f"Benchmark event {i}",
+            "year": 1000 + i,
+            "description": f"Synthetic event number {i}.",
+            "category": CATEGORIES[i % len(CATEGORIES)],
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the image generator against a mock backend")
+    parser.add_argument("--events", type=int, default=60, help="Synthetic events to generate (default: 60)")
+    parser.add_argument("--workers", type=int, default=gen.WORKERS, help=f"Generator workers (default: {gen.WORKERS})")
+    parser.add_argument("--rpm", type=float, default=120, help="Generator's request rate per minute (default: 120)")
+    parser.add_argument("--server-rpm", type=float, default=None, help="Mock server's per-minute limit; beyond it calls get 429 (default: none)")
+    parser.add_argument("--latency", type=float, default=0.5, help="Mean seconds per mock call (default: 0.5)")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Latency spread in seconds (default: 0.2)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls failing outright (default: 0)")
+    parser.add_argument("--quota-rate", type=float, default=0.0, help="Fraction of calls refused with a random 429 (default: 0)")
+    parser.add_argument("--backoff", type=float, default=1.0, help="First quota backoff in seconds (default: 1; the real run uses %d)" % gen.QUOTA_BACKOFF_S)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true", help="Show the generator's per-image output")
+    args = parser.parse_args()
+
+    backend = MockBackend(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        quota_rate=args.quota_rate,
+        server_rpm=args.server_rpm,
+        seed=args.seed,
+    )
+    events = synthetic_events(args.events)
+    scheduler = gen.QuotaScheduler(args.rpm, len(events), backoff_s=args.backoff, backoff_max_s=args.backoff * 20)
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)  # every generator path is relative
+        try:
+            progress = gen.load_progress()
+            plan = gen.plan_work(events, progress)
+            run_log = gen.new_run_log("benchmark")
+            progress["runs"].append(run_log)
+            output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+            started = time.monotonic()
+            with output:
+                gen.generate_pending(backend, progress, plan, run_log, scheduler, args.workers)
+            elapsed = time.monotonic() - started
+        finally:
+            os.chdir(cwd)
+
+    succeeded = run_log["succeeded"]
+    wasted = run_log["attempted"] - succeeded
+    accepted = backend.calls - backend.refused
+    print(f"{'='*60}")
+    print(f"Image generator benchmark ({backend.name} backend)")
+    print(f"{'='*60}")
+    print(f"Events:            {args.events} ({args.workers} workers at {args.rpm:g}/min)")
+    print(f"Wall time:         {elapsed:.1f}s")
+    print(f"Generated:         {succeeded}  (failed {run_log['failed']})")
+    print(f"API calls:         {run_log['attempted']}  ({run_log['quota_errors']} refused with 429)")
+    print(f"Images/minute:     {succeeded / elapsed * 60:.1f}")
+    print(f"Retry overhead:    {wasted / max(succeeded, 1):.2f} wasted calls per image")
+    if args.server_rpm:
+        capacity = args.server_rpm * (1 + elapsed / 60)
+        print(f"Quota utilisation: {accepted / capacity:.0%} of {capacity:.0f} calls admissible at {args.server_rpm:g}/min")
+    else:
+        print(f"Quota utilisation: {accepted / elapsed * 60:.1f} accepted calls/min (no server limit set)")
+    print(f"{'='*60}")
+
+
+if __name__ == "__main__":
+    main()
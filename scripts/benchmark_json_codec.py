@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark json_codec against the stdlib over every file in public/events.
+
+For each file, times parsing and indent-2 output both with plain `json` and through
+json_codec (orjson where it is installed and safe), best of --repeat runs, and checks
+that json_codec's output reproduces the file byte for byte. Exits non-zero if any file
+would not round-trip.
+
+Usage:
+  python scripts/benchmark_json_codec.py
+  python scripts/benchmark_json_codec.py --repeat 20
+  EVENT_JSON_CODEC=stdlib python scripts/benchmark_json_codec.py   # force the fallback
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import event_store
+import json_codec
+
+
+def best_of(repeat: int, fn) -> float:
+    """Fastest of `repeat` calls, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the event-file JSON codec")
+    parser.add_argument("--repeat", type=int, default=10, help="Runs per measurement, best taken (default: 10)")
+    args = parser.parse_args()
+
+    print(f"{'='*72}")
+    print(f"JSON codec benchmark (json_codec backend: {json_codec.BACKEND})")
+    print(f"{'='*72}")
+    print(f"{'file':<22}{'KB':>7}{'load json':>11}{'load codec':>12}{'dump json':>11}{'dump codec':>12}  ok")
+
+    totals = [0.0, 0.0, 0.0, 0.0]
+    size = 0
+    mismatched = []
+    for filename in event_store.event_files(include_unlisted=True):
+        raw = (event_store.EVENTS_DIR / filename).read_bytes()
+        text = raw.decode("utf-8")
+        events = json.loads(text)
+        timings = [
+            best_of(args.repeat, lambda: json.loads(text)),
+            best_of(args.repeat, lambda: json_codec.loads(raw)),
+            best_of(args.repeat, lambda: json.dumps(events, indent=2, ensure_ascii=False)),
+            best_of(args.repeat, lambda: json_codec.dumps(events)),
+        ]
+        identical = json_codec.loads(raw) == events and json_codec.dumps(events) + "\n" == text
+        if not identical:
+            mismatched.append(filename)
+        totals = [t + s for t, s in zip(totals, timings)]
+        size += len(raw)
+        cells = "".join(f"{t:>11.2f}" if i % 2 == 0 else f"{t:>12.2f}" for i, t in enumerate(timings))
+        print(f"{filename:<22}{len(raw) / 1024:>7.0f}{cells}  {'yes' if identical else 'NO'}")
+
+    cells = "".join(f"{t:>11.2f}" if i % 2 == 0 else f"{t:>12.2f}" for i, t in enumerate(totals))
+    print(f"{'-'*72}")
+    print(f"{'total (ms)':<22}{size / 1024:>7.0f}{cells}")
+    print(f"Speed-up:          load {totals[0] / totals[1]:.1f}x, dump {totals[2] / totals[3]:.1f}x")
+    if mismatched:
+        print(f"Not byte-identical: {', '.join(mismatched)}")
+    else:
+        print("Every file round-trips byte for byte through json_codec.")
+    print(f"{'='*72}")
+    return 1 if mismatched else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,19 +11,22 @@ Usage:
 """
 
 import argparse
-import json
+import sys
 import time
 from datetime import datetime, timedelta
 from pathlib import Path
 from urllib.parse import quote
 
-import requests
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import event_store  # noqa: E402
+from http_cache import default_cache  # noqa: E402
 
 # Configuration
 USER_AGENT = "WhenGame/1.0 (difficulty-metric-script; github.com/timeline/when)"
-EVENTS_DIR = Path(__file__).parent.parent.parent / "public" / "events"
 PAGEVIEW_DAYS = 365
 REQUEST_DELAY = 0.2  # Seconds between API calls
+PAGEVIEW_CACHE_TTL = 30 * 24 * 3600  # URLs name their date window, so answers stay valid
 
 # Corrections mapping: event_name -> correct_wikipedia_article
 # Format: "event-name": "Correct_Wikipedia_Article_Title"
@@ -202,7 +205,7 @@ def get_pageviews(article_title: str) -> int | None:
     headers = {"User-Agent": USER_AGENT}
 
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = default_cache().get(url, headers=headers, ttl=PAGEVIEW_CACHE_TTL, timeout=10)
         if response.status_code == 404:
             print(f"    [WARNING] Article not found: {article_title}")
             return None
@@ -220,19 +223,6 @@ def get_wikipedia_url(article_title: str) -> str:
     return f"https://en.wikipedia.org/wiki/{article_title}"
 
 
-def load_events(file_path: Path) -> list:
-    """Load events from a JSON file."""
-    with open(file_path) as f:
-        return json.load(f)
-
-
-def save_events(file_path: Path, events: list):
-    """Save events to a JSON file with nice formatting."""
-    with open(file_path, "w") as f:
-        json.dump(events, f, indent=2, ensure_ascii=False)
-        f.write("\n")
-
-
 def find_event_by_name(events: list, name: str) -> dict | None:
     """Find an event by name (case-insensitive, partial match)."""
     name_lower = name.lower().replace("-", "").replace("_", "")
@@ -245,8 +235,7 @@ def find_event_by_name(events: list, name: str) -> dict | None:
 
 def apply_corrections(dry_run: bool = False):
     """Apply all corrections to event JSON files."""
-    json_files = list(EVENTS_DIR.glob("*.json"))
-    json_files = [f for f in json_files if f.name != "manifest.json"]
+    catalogue = event_store.load(include_unlisted=True)
 
     print("=" * 70)
     print("Wikipedia Misattribution Fixes")
@@ -259,8 +248,7 @@ def apply_corrections(dry_run: bool = False):
     not_found = 0
     pageview_errors = 0
 
-    for json_file in json_files:
-        events = load_events(json_file)
+    for filename, events in catalogue.files.items():
         modified = False
 
         for event in events:
@@ -287,7 +275,7 @@ def apply_corrections(dry_run: bool = False):
             if old_url == new_url:
                 continue
 
-            print(f"\n[{json_file.name}] {event.get('friendly_name', event_name)}")
+            print(f"\n[{filename}] {event.get('friendly_name', event_name)}")
             print(f"  OLD: {old_url}")
             print(f"       ({old_views:,} views)")
             print(f"  NEW: {new_url}")
@@ -311,8 +299,8 @@ def apply_corrections(dry_run: bool = False):
                 fixed += 1
 
         if modified and not dry_run:
-            save_events(json_file, events)
-            print(f"\n[SAVED] {json_file.name}")
+            catalogue.save(filename)
+            print(f"\n[SAVED] {filename}")
 
     # Summary
     print("\n" + "=" * 70)
@@ -6,10 +6,18 @@ generation of this script wrote the `difficulty` string straight through with no
 check and silently skipped any graded file it did not recognise, which is how a tranche
 of events ended up graded by nobody.
 
-Events are rewritten with `json.dump(indent=2, ensure_ascii=False)` plus a trailing
-newline. That round-trip is byte-identical for every file in public/events today, so
-the diff contains exactly one changed line per relabelled event and nothing else — if
-that ever stops being true, the check below fails the run.
+Events are written through `event_store`, which patches only the lines of fields that
+changed and carries every other byte over from the file on disk, so the diff contains
+exactly one changed line per relabelled event and nothing else. All changed files are
+written in one transaction: either every file is rewritten or none, and none is if
+another tool edited one of them since the catalogue was loaded.
+
+The run is whatever extract_batches.py last wrote to batches/: only those batches'
+graded_*.json files are read (every graded file, if there is no batches/ at all). An
+empty batches/ means the last extraction selected nothing, so there is nothing to
+apply and the run is refused. A batched event whose visible fields changed after
+extraction is refused, since its grade is for text the catalogue no longer has. After applying, each graded event's content
+hash goes into the applied-grade ledger, which `extract_batches.py --changed` reads.
 
 Usage:
     python3 scripts/difficulty/grade/apply.py --dry-run
@@ -25,10 +33,13 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 
 from catalogue import (  # noqa: E402
+    APPLIED_FILE,
     DIFFICULTIES,
-    EVENTS_DIR,
+    content_hash,
+    event_store,
+    load_applied,
     load_catalogue,
-    manifest_files,
+    save_applied,
 )
 
 GRADE_DIR = Path(__file__).resolve().parent
@@ -40,11 +51,31 @@ class ValidationError(Exception):
     pass
 
 
-def read_graded():
-    """Load every graded_*.json, returning {name: entry} and the per-batch coverage."""
-    paths = sorted(OUTPUT_DIR.glob("graded_*.json"))
+def read_batches():
+    """{batch name: payload} for the run in batches/, or None if nothing was ever extracted."""
+    if not BATCH_DIR.exists():
+        return None
+    batches = {}
+    for path in sorted(BATCH_DIR.glob("*.json")):
+        with open(path, encoding="utf-8") as f:
+            batch = json.load(f)
+        batches[batch["batch"]] = batch
+    return batches
+
+
+def read_graded(batches, output_dir=OUTPUT_DIR):
+    """Load the run's graded_*.json, returning {name: entry} and the per-batch coverage."""
+    if batches is None:
+        paths = sorted(output_dir.glob("graded_*.json"))
+    elif not batches:
+        raise ValidationError(
+            f"{BATCH_DIR.name}/ is empty: the last extraction selected nothing to grade, so there is nothing to apply"
+        )
+    else:
+        paths = [output_dir / f"graded_{name}.json" for name in batches]
+        paths = [path for path in paths if path.exists()]
     if not paths:
-        raise ValidationError(f"no graded_*.json files in {OUTPUT_DIR}")
+        raise ValidationError(f"no graded_*.json files in {output_dir}")
 
     grades = {}
     origin = {}
@@ -90,8 +121,8 @@ def read_graded():
     return grades, by_batch
 
 
-def check_coverage(grades, by_batch, catalogue):
-    """Every graded name must exist; every batched event must have been graded."""
+def check_coverage(grades, batches, catalogue):
+    """Every graded name must exist; every batched event must have been graded, as extracted."""
     known = {e["name"]: e for e in catalogue}
     errors = []
 
@@ -102,18 +133,26 @@ def check_coverage(grades, by_batch, catalogue):
             + (" ..." if len(unknown) > 10 else "")
         )
 
-    if BATCH_DIR.exists():
-        for path in sorted(BATCH_DIR.glob("*.json")):
-            with open(path, encoding="utf-8") as f:
-                batch = json.load(f)
-            expected = {e["name"] for e in batch["events"]}
-            missing = sorted(expected - set(grades))
-            if missing:
-                errors.append(
-                    f"batch {batch['batch']}: {len(missing)} event(s) never graded: "
-                    + ", ".join(missing[:10])
-                    + (" ..." if len(missing) > 10 else "")
-                )
+    for batch in (batches or {}).values():
+        expected = {e["name"] for e in batch["events"]}
+        missing = sorted(expected - set(grades))
+        if missing:
+            errors.append(
+                f"batch {batch['batch']}: {len(missing)} event(s) never graded: "
+                + ", ".join(missing[:10])
+                + (" ..." if len(missing) > 10 else "")
+            )
+        stale = sorted(
+            e["name"]
+            for e in batch["events"]
+            if e["name"] in known and content_hash(known[e["name"]]) != content_hash(e)
+        )
+        if stale:
+            errors.append(
+                f"batch {batch['batch']}: {len(stale)} event(s) changed since extraction, re-extract: "
+                + ", ".join(stale[:10])
+                + (" ..." if len(stale) > 10 else "")
+            )
 
     # A changed label has to say why. An unchanged one needs no justification.
     unjustified = [
@@ -137,34 +176,31 @@ def check_coverage(grades, by_batch, catalogue):
 def apply_grades(grades, dry_run):
     """Write the new labels, returning (transitions, per-file change counts)."""
     transitions = Counter()
-    changed_by_file = Counter()
-
-    for filename in manifest_files():
-        path = EVENTS_DIR / filename
-        original = path.read_text(encoding="utf-8")
-        events = json.loads(original)
-
-        # Guard the promise that this script only ever moves `difficulty`.
-        if json.dumps(events, indent=2, ensure_ascii=False) + "\n" != original:
-            raise ValidationError(
-                f"{filename}: re-serialising is not byte-identical, so applying grades "
-                "would reformat the file. Fix the formatting before regrading."
-            )
+    catalogue = event_store.load()
 
-        for event in events:
-            entry = grades.get(event["name"])
-            if not entry or entry["difficulty"] == event["difficulty"]:
-                continue
-            transitions[(event["difficulty"], entry["difficulty"])] += 1
-            changed_by_file[filename] += 1
-            event["difficulty"] = entry["difficulty"]
-
-        if changed_by_file[filename] and not dry_run:
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(events, f, indent=2, ensure_ascii=False)
-                f.write("\n")
-
-    return transitions, changed_by_file
+    try:
+        with catalogue.transaction(dry_run=dry_run) as tx:
+            for event in catalogue.events:
+                entry = grades.get(event["name"])
+                if not entry or entry["difficulty"] == event["difficulty"]:
+                    continue
+                transitions[(event["difficulty"], entry["difficulty"])] += 1
+                tx.set(event, difficulty=entry["difficulty"])
+    except event_store.ConflictError as exc:
+        raise ValidationError(str(exc)) from exc
+
+    return transitions, Counter(tx.changed)
+
+
+def record_applied(grades, catalogue):
+    """Note the content hash each graded event was graded against. Returns how many."""
+    applied = load_applied()
+    known = {e["name"]: e for e in catalogue}
+    for name in grades:
+        if name in known:
+            applied[name] = content_hash(known[name])
+    save_applied(applied)
+    return sum(1 for name in grades if name in known)
 
 
 def report(grades, catalogue, transitions, changed_by_file):
@@ -208,9 +244,10 @@ def main():
     args = parser.parse_args()
 
     try:
-        grades, by_batch = read_graded()
+        batches = read_batches()
+        grades, _by_batch = read_graded(batches)
         catalogue = load_catalogue(playable_only=False)
-        check_coverage(grades, by_batch, catalogue)
+        check_coverage(grades, batches, catalogue)
         transitions, changed_by_file = apply_grades(grades, args.dry_run)
     except ValidationError as exc:
         print("VALIDATION FAILED\n", file=sys.stderr)
@@ -218,7 +255,11 @@ def main():
         return 1
 
     report(grades, catalogue, transitions, changed_by_file)
-    print("\n(dry run, nothing written)" if args.dry_run else "\napplied")
+    if args.dry_run:
+        print("\n(dry run, nothing written)")
+    else:
+        recorded = record_applied(grades, catalogue)
+        print(f"\napplied; {recorded} grade(s) recorded in {APPLIED_FILE.name}")
     return 0
 
 
@@ -4,16 +4,29 @@
 It exists so the grading tooling can report the bands the game will actually compute
 without booting the app. If you change the scoring in TypeScript, change it here too
 and re-check `band_report.py` against the numbers in the PR body.
+
+Loading and writing go through the shared `event_store` module in scripts/. The
+applied-grade ledger (`APPLIED_FILE`) records, per event, a hash of the fields the
+grader saw when its current grade was applied, so a regrade can skip what hasn't
+changed. Scoring runs on a column view of the catalogue (`CatalogueArrays`) with
+NumPy; every step is the TypeScript's step applied to a whole array at once, in the
+same float64 operation order, so the scores come out bit-identical to the per-event
+loop it replaced.
 """
 
-import bisect
+import hashlib
 import json
 import math
+import sys
 from collections import Counter
 from pathlib import Path
 
-PROJECT_ROOT = Path(__file__).resolve().parents[3]
-EVENTS_DIR = PROJECT_ROOT / "public" / "events"
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+import event_store  # noqa: E402
+from event_store import EVENTS_DIR, PROJECT_ROOT, manifest_files  # noqa: E402, F401
 
 DIFFICULTIES = ["easy", "medium", "hard", "very-hard"]
 
@@ -23,17 +36,20 @@ RECOGNITION_RANK = {"easy": 0.0, "medium": 1 / 3, "hard": 2 / 3, "very-hard": 1.
 W_RECOGNITION = 0.6
 DENSITY_WINDOW_YEARS = 25
 
+# The fields an agent is allowed to see. Crowding is deliberately absent: it is
+# computed by difficultyScore.ts from the year distribution, and a grader who also
+# scores it by hand double-counts it. Wikipedia view counts are absent too — they
+# cover only the events an older process already graded, and they measure article
+# traffic rather than event recognition.
+FIELDS = ["name", "friendly_name", "year", "category", "description"]
+
+APPLIED_FILE = Path(__file__).resolve().parent / "output" / "applied.json"
+
 # Mirrors SPREAD in deckBuilder.ts: a band supplies at most floor(size / SPREAD) cards
 # to any one deck.
 SPREAD = 6
 
 
-def manifest_files():
-    """The event files the game actually loads, in manifest order."""
-    with open(EVENTS_DIR / "manifest.json", encoding="utf-8") as f:
-        return json.load(f)["files"]
-
-
 def load_catalogue(playable_only=True):
     """Load the catalogue the way the app and the tests do.
 
@@ -41,21 +57,94 @@ def load_catalogue(playable_only=True):
     a Cloudinary image — that is the pool `loadCatalogue` builds in the test helpers,
     so it is the pool whose quartiles the game sees.
 
-    Returns a list of dicts, each with a `_file` key naming its source file.
+    Returns a list of copies, each with a `_file` key naming its source file, so
+    callers can annotate them freely without it reaching the event files.
     """
-    seen = set()
-    events = []
-    for filename in manifest_files():
-        with open(EVENTS_DIR / filename, encoding="utf-8") as f:
-            for event in json.load(f):
-                if event["name"] in seen:
-                    continue
-                if playable_only and "res.cloudinary.com" not in (event.get("image_url") or ""):
-                    continue
-                seen.add(event["name"])
-                event["_file"] = filename
-                events.append(event)
-    return events
+    catalogue = event_store.load()
+    events = catalogue.playable() if playable_only else catalogue.unique
+    return [{**event, "_file": catalogue.file_of(event)} for event in events]
+
+
+def content_hash(event):
+    """Hash of the FIELDS a grader sees: equal hashes mean the same thing was graded."""
+    visible = json.dumps([event.get(k) for k in FIELDS], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(visible.encode("utf-8")).hexdigest()[:16]
+
+
+def load_applied():
+    """{name: content hash} for every event whose current grade was applied by apply.py."""
+    if not APPLIED_FILE.exists():
+        return {}
+    with open(APPLIED_FILE, encoding="utf-8") as f:
+        return json.load(f)["events"]
+
+
+def save_applied(applied):
+    text = json.dumps({"events": dict(sorted(applied.items()))}, indent=2, ensure_ascii=False) + "\n"
+    event_store.write_atomic(APPLIED_FILE, text)
+
+
+def _encode(values):
+    """(sorted distinct values, code array) for a list of strings."""
+    distinct = sorted(set(values))
+    index = {value: i for i, value in enumerate(distinct)}
+    return distinct, np.fromiter((index[v] for v in values), dtype=np.int64, count=len(values))
+
+
+class CatalogueArrays:
+    """Column view of a deduped catalogue: one array per field the scoring reads.
+
+    Row i of every array is `events[i]`. Categories and labels are coded as indexes
+    into `categories` and `labels`, both sorted.
+    """
+
+    def __init__(self, events):
+        self.names = [e["name"] for e in events]
+        self.years = np.array([e["year"] for e in events], dtype=np.int64)
+        self.categories, self.category_codes = _encode([e["category"] for e in events])
+        self.labels, self.label_codes = _encode([e["difficulty"] for e in events])
+        rank = np.array([RECOGNITION_RANK.get(label, 0.5) for label in self.labels], dtype=np.float64)
+        self.recognition = rank[self.label_codes] if len(events) else np.zeros(0)
+
+    def __len__(self):
+        return len(self.names)
+
+
+def placeability(density):
+    """log1p(density) / log1p(max density), per event."""
+    # math.log1p per distinct density rather than np.log1p, whose last bit can differ
+    # from the libm result the scalar port produced. V8's Math.log1p differs from libm
+    # in the last bit for a few densities too; parity.py measures that.
+    max_density = int(density.max()) if len(density) else 0
+    log1p = np.array([math.log1p(d) for d in range(max_density + 1)])
+    max_log_density = log1p[max_density] or 1
+    return log1p[density] / max_log_density
+
+
+def score_arrays(columns):
+    """Vectorised `buildDifficultyIndex`: (u, density, score, band) arrays in row order."""
+    n = len(columns)
+    order = np.argsort(columns.years, kind="stable")  # ties keep catalogue order, as sorted() does
+    sorted_years = columns.years[order]
+
+    u = np.empty(n, dtype=np.float64)
+    u[order] = np.arange(n) / max(1, n - 1)
+
+    # Closed window [year - w, year + w], excluding the event itself.
+    density = np.maximum(
+        0,
+        np.searchsorted(sorted_years, columns.years + DENSITY_WINDOW_YEARS + 1, side="left")
+        - np.searchsorted(sorted_years, columns.years - DENSITY_WINDOW_YEARS, side="left")
+        - 1,
+    )
+
+    score = W_RECOGNITION * columns.recognition + (1 - W_RECOGNITION) * placeability(density)
+
+    ascending = np.sort(score)
+    cuts = np.array([ascending[min(n - 1, int(n * p))] for p in (0.25, 0.5, 0.75)]) if n else np.zeros(3)
+    # 0 if s < q1, 1 if s < q2, 2 if s < q3, else 3
+    band = np.searchsorted(cuts, score, side="right")
+    return u, density, score, band
 
 
 def score_catalogue(events):
@@ -64,41 +153,13 @@ def score_catalogue(events):
     Port of `buildDifficultyIndex`. `events` must already be deduped by name — the
     TypeScript keys its metrics map by name, so duplicates collapse there too.
     """
-    by_year = sorted(events, key=lambda e: e["year"])
-    years = [e["year"] for e in by_year]
-    denominator = max(1, len(by_year) - 1)
-
-    metrics = {}
-    densities = []
-    for i, event in enumerate(by_year):
-        year = event["year"]
-        # Closed window [year - w, year + w], excluding the event itself.
-        density = max(
-            0,
-            bisect.bisect_left(years, year + DENSITY_WINDOW_YEARS + 1)
-            - bisect.bisect_left(years, year - DENSITY_WINDOW_YEARS)
-            - 1,
-        )
-        densities.append(density)
-        metrics[event["name"]] = {"u": i / denominator, "density": density, "score": 0.0, "band": 0}
-
-    max_log_density = math.log1p(max(densities, default=0)) or 1
-    for event in by_year:
-        m = metrics[event["name"]]
-        placeability = math.log1p(m["density"]) / max_log_density
-        recognition = RECOGNITION_RANK.get(event["difficulty"], 0.5)
-        m["score"] = W_RECOGNITION * recognition + (1 - W_RECOGNITION) * placeability
-
-    ascending = sorted(m["score"] for m in metrics.values())
-
-    def quartile(p):
-        return ascending[min(len(ascending) - 1, int(len(ascending) * p))]
-
-    q1, q2, q3 = quartile(0.25), quartile(0.5), quartile(0.75)
-    for m in metrics.values():
-        s = m["score"]
-        m["band"] = 0 if s < q1 else 1 if s < q2 else 2 if s < q3 else 3
-    return metrics
+    columns = CatalogueArrays(events)
+    order = np.argsort(columns.years, kind="stable")
+    u, density, score, band = (a[order].tolist() for a in score_arrays(columns))
+    return {
+        columns.names[i]: {"u": u_, "density": d, "score": s, "band": b}
+        for i, u_, d, s, b in zip(order.tolist(), u, density, score, band)
+    }
 
 
 def band_table(events, metrics):
@@ -108,21 +169,26 @@ def band_table(events, metrics):
     composes 24 cards, so a category whose budget is under 24 will push the builder
     onto its soft-cap fallback.
     """
-    rows = []
-    for category in sorted({e["category"] for e in events}):
-        subset = [e for e in events if e["category"] == category]
-        counts = Counter(metrics[e["name"]]["band"] for e in subset)
-        budget = sum(max(1, counts[b] // SPREAD) for b in range(4) if counts[b])
-        rows.append(
-            {
-                "category": category,
-                "total": len(subset),
-                "bands": [counts[b] for b in range(4)],
-                "budget": budget,
-                "labels": Counter(e["difficulty"] for e in subset),
-            }
-        )
-    return rows
+    columns = CatalogueArrays(events)
+    bands = np.array([metrics[name]["band"] for name in columns.names], dtype=np.int64)
+    n_categories, n_labels = len(columns.categories), len(columns.labels)
+
+    counts = np.bincount(columns.category_codes * 4 + bands, minlength=n_categories * 4).reshape(n_categories, 4)
+    labels = np.bincount(
+        columns.category_codes * n_labels + columns.label_codes, minlength=n_categories * n_labels
+    ).reshape(n_categories, n_labels)
+    budgets = np.where(counts > 0, np.maximum(1, counts // SPREAD), 0).sum(axis=1)
+
+    return [
+        {
+            "category": category,
+            "total": int(counts[c].sum()),
+            "bands": counts[c].tolist(),
+            "budget": int(budgets[c]),
+            "labels": Counter({columns.labels[j]: int(labels[c, j]) for j in np.flatnonzero(labels[c]).tolist()}),
+        }
+        for c, category in enumerate(columns.categories)
+    ]
 
 
 def format_distribution(counter, total=None):
@@ -7,14 +7,37 @@ events are scattered across a dozen files. Calibrating a target distribution per
 therefore gives no guarantee at all for the pools the deck builder actually draws from;
 measured, a per-file target collapses trade's band-0 pool from 30 to 17.
 
-Categories over BATCH_SIZE are split round-robin by year rank rather than into
-contiguous era chunks, so every part carries the same spread of eras and the same
-target distribution applies to each.
+Batches are sized by estimated token cost rather than event count, because an agent's
+time goes on reading descriptions, and a category of long ones took far longer than
+one of short ones. A category is split into as many parts as TOKEN_BUDGET (and, as a
+cap on events, BATCH_SIZE) calls for. The split is round-robin by year rank rather
+than into contiguous era chunks, so every part carries the same spread of eras and the
+same target distribution applies to each: events are dealt in year order, one round
+of `parts` events at a time, each part taking exactly one event per round, and within
+a round the heaviest event goes to the part with the fewest tokens so far. Every part
+therefore has the same events-per-era as before and a near-equal token cost.
+
+A batched event carries exactly the FIELDS the grader sees (plus its current label),
+so `content_hash` of the entry is the hash of what was graded; it is not written into
+the batch, where it would only cost tokens. `apply.py` records those hashes for the
+grades it applies, so `--changed` can batch only the events that are new or whose
+visible fields changed since their grade was applied: adding 200 events costs 200
+gradings, not a regrade of the catalogue. Those batches are named `changed_<category>`;
+the category counts in each payload still cover the whole category, since that is what
+the target distribution is judged against.
+
+Either mode replaces everything in batches/, so the directory always holds exactly
+the run `apply.py` will check. If `--changed` finds nothing, batches/ is left empty,
+and apply.py refuses to run rather than re-applying an older grading.
 
 Usage:
     python3 scripts/difficulty/grade/extract_batches.py
+    python3 scripts/difficulty/grade/extract_batches.py --changed
+    python3 scripts/difficulty/grade/extract_batches.py --token-budget 8000
 """
 
+import argparse
+import heapq
 import json
 import sys
 from collections import Counter, defaultdict
@@ -22,69 +45,125 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 
-from catalogue import DIFFICULTIES, load_catalogue  # noqa: E402
+from catalogue import (  # noqa: E402
+    APPLIED_FILE,
+    DIFFICULTIES,
+    FIELDS,
+    content_hash,
+    load_applied,
+    load_catalogue,
+)
 
 BATCH_DIR = Path(__file__).resolve().parent / "batches"
 BATCH_SIZE = 250
+TOKEN_BUDGET = 12_000
+CHARS_PER_TOKEN = 4  # a rough English-text average; only the relative sizes matter
+CHANGED_PREFIX = "changed_"
 
-# The fields an agent is allowed to see. Crowding is deliberately absent: it is
-# computed by difficultyScore.ts from the year distribution, and a grader who also
-# scores it by hand double-counts it. Wikipedia view counts are absent too — they
-# cover only the events an older process already graded, and they measure article
-# traffic rather than event recognition.
-FIELDS = ["name", "friendly_name", "year", "category", "description"]
 
+def batch_entry(event):
+    """What the grader is shown for one event."""
+    return {**{k: event[k] for k in FIELDS}, "current_difficulty": event["difficulty"]}
+
+
+def estimate_tokens(entry):
+    return -(-len(json.dumps(entry, indent=2, ensure_ascii=False)) // CHARS_PER_TOKEN)
+
+
+def batches_for(category, entries, token_budget=TOKEN_BUDGET):
+    """Deal a category's entries into year-interleaved parts of near-equal token cost.
+
+    Returns [(batch name, entries, estimated tokens)].
+    """
+    ordered = sorted(entries, key=lambda e: (e["year"], e["name"]))
+    cost = [estimate_tokens(e) for e in ordered]
+    parts = max(1, -(-sum(cost) // token_budget), -(-len(ordered) // BATCH_SIZE))
+    if parts == 1:
+        return [(category, ordered, sum(cost))]
 
-def batches_for(category, events):
-    """Round-robin a category's events into parts of at most BATCH_SIZE."""
-    ordered = sorted(events, key=lambda e: (e["year"], e["name"]))
-    parts = -(-len(ordered) // BATCH_SIZE)
-    if parts <= 1:
-        return [(category, ordered)]
     buckets = [[] for _ in range(parts)]
-    for i, event in enumerate(ordered):
-        buckets[i % parts].append(event)
-    return [(f"{category}_part{i + 1}", sorted(b, key=lambda e: e["year"])) for i, b in enumerate(buckets)]
+    totals = [0] * parts
+    for start in range(0, len(ordered), parts):
+        round_ = sorted(range(start, min(start + parts, len(ordered))), key=lambda i: -cost[i])
+        lightest = heapq.nsmallest(len(round_), range(parts), key=lambda b: (totals[b], b))
+        for i, b in zip(round_, lightest):
+            buckets[b].append(ordered[i])
+            totals[b] += cost[i]
+    return [
+        (f"{category}_part{b + 1}", sorted(buckets[b], key=lambda e: e["year"]), totals[b])
+        for b in range(parts)
+    ]
 
 
 def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--changed", action="store_true", help="batch only events that are new or changed since their grade was applied"
+    )
+    parser.add_argument(
+        "--token-budget", type=int, default=TOKEN_BUDGET, help=f"estimated tokens per batch (default: {TOKEN_BUDGET})"
+    )
+    args = parser.parse_args()
+
     events = load_catalogue()
     by_category = defaultdict(list)
     for event in events:
+        event["hash"] = content_hash(event)
         by_category[event["category"]].append(event)
 
+    selected = events
+    prefix = ""
+    if args.changed:
+        applied = load_applied()
+        if not applied:
+            print(f"ERROR: no grades recorded in {APPLIED_FILE.name} yet; grade and apply a full extraction first")
+            return 1
+        selected = [e for e in events if applied.get(e["name"]) != e["hash"]]
+        new = sum(1 for e in selected if e["name"] not in applied)
+        print(f"{len(selected)} of {len(events)} events to grade ({new} new, {len(selected) - new} changed)\n")
+        prefix = CHANGED_PREFIX
+        if not selected:
+            print("Nothing to grade; batches/ is left empty and apply.py will have nothing to apply.\n")
+    to_batch = defaultdict(list)
+    for event in selected:
+        to_batch[event["category"]].append(event)
+
     BATCH_DIR.mkdir(parents=True, exist_ok=True)
     for stale in BATCH_DIR.glob("*.json"):
         stale.unlink()
 
     written = 0
     total = 0
-    for category in sorted(by_category):
+    costs = []
+    for category in sorted(to_batch):
         members = by_category[category]
         labels = Counter(e["difficulty"] for e in members)
-        for batch_name, batch_events in batches_for(category, members):
+        entries = [batch_entry(e) for e in to_batch[category]]
+        for batch_name, batch_events, tokens in batches_for(category, entries, args.token_budget):
+            batch_name = prefix + batch_name
             payload = {
                 "batch": batch_name,
                 "category": category,
                 "count": len(batch_events),
+                "estimated_tokens": tokens,
                 "category_total": len(members),
                 "category_current_labels": {d: labels[d] for d in DIFFICULTIES},
-                "events": [
-                    {**{k: e[k] for k in FIELDS}, "current_difficulty": e["difficulty"]}
-                    for e in batch_events
-                ],
+                "events": batch_events,
             }
             path = BATCH_DIR / f"{batch_name}.json"
             with open(path, "w", encoding="utf-8") as f:
                 json.dump(payload, f, indent=2, ensure_ascii=False)
                 f.write("\n")
-            print(f"{batch_name:24}{len(batch_events):>5} events")
+            print(f"{batch_name:24}{len(batch_events):>5} events{tokens:>8,} tokens")
             written += 1
             total += len(batch_events)
+            costs.append(tokens)
 
+    if costs:
+        print(f"\nestimated tokens per batch: max {max(costs):,}, mean {sum(costs) // len(costs):,}, min {min(costs):,}")
     print(f"\n{written} batches, {total} events -> {BATCH_DIR.relative_to(Path.cwd()) if BATCH_DIR.is_relative_to(Path.cwd()) else BATCH_DIR}")
-    if total != len(events):
-        print(f"ERROR: batched {total} but catalogue holds {len(events)}")
+    if total != len(selected):
+        print(f"ERROR: batched {total} but selected {len(selected)}")
         return 1
     return 0
 
@@ -0,0 +1,160 @@
+"""Grader backends for run_grading.py.
+
+A grader has a `name`, a `version` and `grade(batch, events) -> list[dict]`, which
+grades `events` (some or all of `batch["events"]`, as extract_batches.py wrote them)
+and returns one entry per event: {"name", "difficulty", "recognition",
+"inferability", "reasoning"}. `remote` graders cost an API call per `grade`, so the
+runner rate-limits and retries them. `name` and `version` key the replay cache:
+anything that can change a grade (model, prompt, rules) must change `version`.
+
+`RuleGrader` is a deterministic local stand-in for exercising the pipeline offline;
+its grades are mechanical and are not meant to be applied. `GeminiGrader` asks a
+Gemini model and needs GEMINI_API_KEY.
+"""
+
+import hashlib
+import json
+import re
+
+from catalogue import DIFFICULTIES
+
+GRADING_INSTRUCTIONS = """\
+You are grading cards for a timeline game, where players place historical events in
+order by year. For each event, grade how hard it is for a general audience to place,
+judging only from its name and description:
+
+- recognition: would most people know this event? one of high, medium, low, very-low
+- inferability: do the name and description give away the era (named periods,
+  empires, technologies, people)? one of high, medium, low
+- difficulty: easy, medium, hard or very-hard, combining the two. An obscure event
+  with a strong era anchor is easier than its obscurity suggests.
+
+Do not grade how crowded the event's era is; the game measures that separately.
+`current_difficulty` is the existing grade: keep it unless you disagree, and when you
+change it, say why in `reasoning`. The category's current label counts are given so
+you can keep the category's spread of grades sensible.
+
+Answer with only a JSON array holding one object per event, in the order given:
+{"name": ..., "difficulty": ..., "recognition": ..., "inferability": ..., "reasoning": "one sentence"}
+"""
+
+# Clues that pin an event to an era without knowing it: a year, a century, a named period.
+ERA_ANCHOR = re.compile(
+    r"\b(\d{3,4}s?|\d+(st|nd|rd|th)[- ]century|BCE|BC|ancient|medieval|prehistoric|"
+    r"Roman|Greek|Egyptian|Sumerian|Babylonian|Bronze Age|Iron Age|Stone Age|Renaissance|"
+    r"Victorian|Industrial|World War|Cold War|Ice Age|Jurassic|Cretaceous)\b",
+    re.IGNORECASE,
+)
+
+
+class RuleGrader:
+    """Deterministic stand-in: recognition from the current label, inferability from era clues."""
+
+    name = "rules"
+    version = "1"
+    remote = False
+
+    RECOGNITION = {"easy": "high", "medium": "medium", "hard": "low", "very-hard": "very-low"}
+    # (recognition, anchored) -> difficulty: a clear era anchor takes an obscure event down a grade.
+    DIFFICULTY = {
+        ("high", True): "easy",
+        ("high", False): "easy",
+        ("medium", True): "medium",
+        ("medium", False): "medium",
+        ("low", True): "medium",
+        ("low", False): "hard",
+        ("very-low", True): "hard",
+        ("very-low", False): "very-hard",
+    }
+
+    def grade(self, batch: dict, events: list[dict]) -> list[dict]:
+        graded = []
+        for event in events:
+            recognition = self.RECOGNITION.get(event.get("current_difficulty"), "low")
+            anchored = bool(ERA_ANCHOR.search(f"{event.get('friendly_name', '')} {event.get('description', '')}"))
+            graded.append(
+                {
+                    "name": event["name"],
+                    "difficulty": self.DIFFICULTY[(recognition, anchored)],
+                    "recognition": recognition,
+                    "inferability": "high" if anchored else "low",
+                    "reasoning": f"rules: recognition {recognition} from the current label; "
+                    f"era {'anchored' if anchored else 'not anchored'} by the description",
+                }
+            )
+        return graded
+
+
+class GeminiGrader:
+    """One Gemini call per batch (or per batch's ungraded remainder)."""
+
+    name = "gemini"
+    remote = True
+
+    def __init__(self, api_key: str | None, model: str):
+        self.api_key = api_key
+        self.model = model
+        prompt_version = hashlib.sha256(GRADING_INSTRUCTIONS.encode("utf-8")).hexdigest()[:8]
+        self.version = f"{model}/{prompt_version}"
+        self._client = None
+
+    def _connect(self):
+        # Created on first use, so an offline replay needs neither the key nor the SDK.
+        if self._client is None:
+            from google import genai
+
+            if not self.api_key:
+                raise RuntimeError("GEMINI_API_KEY is not set")
+            self._client = genai.Client(api_key=self.api_key)
+        return self._client
+
+    def grade(self, batch: dict, events: list[dict]) -> list[dict]:
+        from google.genai import types
+
+        context = {
+            "category": batch["category"],
+            "category_current_labels": batch.get("category_current_labels", {}),
+            "events": events,
+        }
+        response = self._connect().models.generate_content(
+            model=self.model,
+            contents=f"{GRADING_INSTRUCTIONS}\n{json.dumps(context, indent=2, ensure_ascii=False)}",
+            config=types.GenerateContentConfig(response_mime_type="application/json", temperature=0),
+        )
+        graded = json.loads(response.text)
+        if not isinstance(graded, list):
+            raise ValueError("expected a JSON array of grades")
+        return graded
+
+
+def check_grades(events: list[dict], graded: list[dict]) -> tuple[dict, list[str]]:
+    """({name: entry} for the well-formed grades of `events`, problems with the rest)."""
+    wanted = {event["name"]: event for event in events}
+    good = {}
+    problems = []
+    for entry in graded:
+        name = entry.get("name") if isinstance(entry, dict) else None
+        if name not in wanted:
+            problems.append(f"unexpected entry {name!r}")
+            continue
+        if name in good:
+            problems.append(f"{name}: graded twice")
+            continue
+        difficulty = entry.get("difficulty")
+        reasoning = str(entry.get("reasoning") or "").strip()
+        if difficulty not in DIFFICULTIES:
+            problems.append(f"{name}: difficulty {difficulty!r} is not one of {DIFFICULTIES}")
+        elif difficulty != wanted[name].get("current_difficulty") and not reasoning:
+            problems.append(f"{name}: changed label with no reasoning")
+        else:
+            good[name] = {
+                "name": name,
+                "difficulty": difficulty,
+                "recognition": entry.get("recognition"),
+                "inferability": entry.get("inferability"),
+                "reasoning": reasoning,
+            }
+    missing = [name for name in wanted if name not in good]
+    if missing:
+        problems.append(f"{len(missing)} event(s) without a usable grade: {', '.join(missing[:10])}")
+    return good, problems
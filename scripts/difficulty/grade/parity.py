@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""Golden-output parity between `catalogue.score_catalogue` and difficultyScore.ts.
+
+The Python scorer is a hand-kept port of `buildDifficultyIndex`. This checks the two
+still agree, on catalogues far bigger and nastier than the real one, so the Python
+side can be optimised without drifting from the game:
+
+1. `generate` writes each case's catalogue and the Python scorer's output to
+   .cache/difficulty-parity/. The cases are the live playable catalogue plus one
+   seeded random catalogue per seed: tens of thousands of events with a crowded
+   modern era, long sparse BCE stretches, geological years down to -4.5 billion,
+   piles of events sharing one year, and a few labels the rank table doesn't know.
+2. src/utils/difficultyScore.parity.test.ts scores every catalogue there with the
+   real TypeScript, writes its output next to the Python's, and fails on any
+   difference. Without fixtures it is skipped:
+
+       CI=true npx react-scripts test difficultyScore.parity
+
+3. `compare` diffs the two outputs per case and reports each scorer's timing. u,
+   density and band must match exactly (both sides print floats as the shortest
+   round-tripping decimal). Scores may differ by at most SCORE_TOLERANCE: V8's
+   Math.log1p and the C library's log1p disagree in the last bit for a few inputs
+   (densities 175 and 184 among the first 20,000), which is reported but tolerated
+   because it cannot move a band unless two distinct scores already sit within an
+   ulp of each other.
+
+Usage:
+    python3 scripts/difficulty/grade/parity.py generate
+    python3 scripts/difficulty/grade/parity.py generate --events 80000 --seeds 1 2 3 4
+    python3 scripts/difficulty/grade/parity.py compare
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from catalogue import DIFFICULTIES, PROJECT_ROOT, load_catalogue, score_catalogue  # noqa: E402
+
+PARITY_DIR = PROJECT_ROOT / ".cache" / "difficulty-parity"
+FIELDS = ("name", "year", "category", "difficulty")
+
+# Years a random catalogue piles events onto, so ties are common at every scale.
+TIED_YEARS = [-4_500_000_000, -66_000_000, -10_000, -500, 0, 1066, 1492, 1945, 1969, 2000]
+UNKNOWN_LABEL = "unrated"  # not in RECOGNITION_RANK: both sides fall back to 0.5
+
+# Scores lie in 0..1, so one machine epsilon covers a last-bit log1p difference.
+SCORE_TOLERANCE = sys.float_info.epsilon
+
+
+def random_year(rng):
+    roll = rng.random()
+    if roll < 0.50:
+        return 2025 - min(325, int(rng.expovariate(1 / 70)))  # crowded modern era
+    if roll < 0.70:
+        return rng.randint(500, 1700)
+    if roll < 0.82:
+        return rng.randint(-3000, 500)
+    if roll < 0.92:
+        # Deep time, rounded the way the catalogue dates it, which makes ties there too.
+        years = 10 ** rng.uniform(4, 9.65)
+        step = 10 ** max(0, len(str(int(years))) - 3)
+        return -int(years // step * step)
+    return rng.choice(TIED_YEARS)
+
+
+def random_catalogue(seed, count, categories):
+    rng = random.Random(seed)
+    labels = DIFFICULTIES + [UNKNOWN_LABEL]
+    weights = [24, 34, 28, 13, 1]
+    return [
+        {
+            "name": f"parity-{seed}-{i}",
+            "year": random_year(rng),
+            "category": rng.choice(categories),
+            "difficulty": rng.choices(labels, weights)[0],
+        }
+        for i in range(count)
+    ]
+
+
+def timed_score(events, repeat):
+    """(metrics, best elapsed ms) over `repeat` runs."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        metrics = score_catalogue(events)
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return metrics, best
+
+
+def dump_metrics(metrics):
+    """{name: [u, density, score, band]}, the layout both scorers write."""
+    return {name: [m["u"], m["density"], m["score"], m["band"]] for name, m in metrics.items()}
+
+
+def write_json(path, data):
+    path.write_text(json.dumps(data, separators=(",", ":")) + "\n", encoding="utf-8")
+
+
+def generate(args):
+    PARITY_DIR.mkdir(parents=True, exist_ok=True)
+    for stale in PARITY_DIR.glob("*.json"):
+        stale.unlink()
+
+    live = [{key: event[key] for key in FIELDS} for event in load_catalogue()]
+    categories = sorted({event["category"] for event in live})
+    cases = [("live", live)]
+    cases += [(f"random-{seed}", random_catalogue(seed, args.events, categories)) for seed in args.seeds]
+
+    for case, events in cases:
+        metrics, elapsed = timed_score(events, args.repeat)
+        write_json(PARITY_DIR / f"{case}.catalogue.json", events)
+        write_json(
+            PARITY_DIR / f"{case}.python.json",
+            {"case": case, "scorer": "python", "events": len(events), "elapsed_ms": elapsed, "metrics": dump_metrics(metrics)},
+        )
+        years = [e["year"] for e in events]
+        print(
+            f"{case:<12} {len(events):>7} events, {len(events) - len(set(years)):>6} tied years, "
+            f"min year {min(years):,}  python {elapsed:8.1f} ms"
+        )
+    print(f"\nWrote {len(cases)} case(s) to {PARITY_DIR.relative_to(PROJECT_ROOT)}/")
+    print("Next: CI=true npx react-scripts test difficultyScore.parity, then parity.py compare")
+    return 0
+
+
+def diff_case(python, typescript, limit):
+    """(mismatch count, score drift count, example lines) between two scorer outputs."""
+    fields = ("u", "density", "score", "band")
+    py, ts = python["metrics"], typescript["metrics"]
+    problems = []
+    drift = 0
+    for name in sorted(py.keys() ^ ts.keys()):
+        problems.append(f"{name}: only in {'python' if name in py else 'typescript'}")
+    for name in py.keys() & ts.keys():
+        for field, a, b in zip(fields, py[name], ts[name]):
+            if a == b:
+                continue
+            if field == "score" and abs(a - b) <= SCORE_TOLERANCE:
+                drift += 1
+            else:
+                problems.append(f"{name}: {field} python={a!r} typescript={b!r}")
+    return len(problems), drift, sorted(problems)[:limit]
+
+
+def compare(args):
+    cases = sorted(p.name.removesuffix(".catalogue.json") for p in PARITY_DIR.glob("*.catalogue.json"))
+    if not cases:
+        print(f"No fixtures in {PARITY_DIR}; run `parity.py generate` first.", file=sys.stderr)
+        return 1
+
+    failed = False
+    print(f"{'case':<12} {'events':>7} {'python ms':>10} {'ts ms':>10}  result")
+    for case in cases:
+        python = json.loads((PARITY_DIR / f"{case}.python.json").read_text(encoding="utf-8"))
+        ts_path = PARITY_DIR / f"{case}.typescript.json"
+        if not ts_path.exists():
+            print(f"{case:<12} {python['events']:>7} {python['elapsed_ms']:>10.1f} {'-':>10}  no TypeScript output")
+            failed = True
+            continue
+        typescript = json.loads(ts_path.read_text(encoding="utf-8"))
+        count, drift, examples = diff_case(python, typescript, args.show)
+        result = f"{count} difference(s)" if count else "identical"
+        if drift:
+            result += f", {drift} score(s) off by an ulp"
+        print(f"{case:<12} {python['events']:>7} {python['elapsed_ms']:>10.1f} {typescript['elapsed_ms']:>10.1f}  {result}")
+        for line in examples:
+            print(f"    {line}")
+        failed |= bool(count)
+    return 1 if failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    gen = sub.add_parser("generate", help="write catalogues and the Python scorer's output")
+    gen.add_argument("--events", type=int, default=50_000, help="events per random catalogue (default: 50000)")
+    gen.add_argument("--seeds", type=int, nargs="+", default=[1, 2, 3], help="one random catalogue per seed (default: 1 2 3)")
+    gen.add_argument("--repeat", type=int, default=3, help="time the best of this many runs (default: 3)")
+    cmp = sub.add_parser("compare", help="diff the Python output against the TypeScript output")
+    cmp.add_argument("--show", type=int, default=10, help="differences to print per case (default: 10)")
+    args = parser.parse_args()
+    return generate(args) if args.command == "generate" else compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""Grade the batches in batches/ concurrently and write their graded_*.json.
+
+This is the step between extract_batches.py and apply.py. Every batch goes to a worker
+pool; each worker asks the grader (see graders.py) for the batch's grades, checks
+them, and writes output/graded_<batch>.json in the schema apply.py reads. Once every
+batch is written, the run reads them back through `apply.read_graded` so a schema
+problem surfaces here rather than at apply time.
+
+Every grade is kept in a replay cache (.cache/grades.sqlite) keyed by grader, grader
+version, the event's content hash and its current label (graders are shown it, so a
+label apply.py changed since is a different question), so:
+
+- a rerun only asks for what is missing: an interrupted run resumes where it stopped,
+  and a batch whose grader returned a partial answer retries just the remainder
+- an unchanged event is never graded twice by the same grader version, whichever
+  batch it lands in
+- `--offline` rebuilds every graded file from the cache alone, with no key or network,
+  and fails on anything the cache doesn't hold
+
+A graded file written by someone else (another grader, or by hand) is kept unless
+`--overwrite` is given. The rules grader is a deterministic stand-in for exercising
+the pipeline; its output goes to .cache/graded-rules/ unless `--output-dir` says
+otherwise, so it cannot be applied by accident.
+
+Usage:
+    python3 scripts/difficulty/grade/run_grading.py --grader rules
+    python3 scripts/difficulty/grade/run_grading.py --grader gemini --workers 4 --rpm 10
+    python3 scripts/difficulty/grade/run_grading.py --grader gemini --offline
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from apply import OUTPUT_DIR, ValidationError, read_batches, read_graded  # noqa: E402
+from catalogue import PROJECT_ROOT, content_hash, event_store  # noqa: E402
+from graders import GeminiGrader, RuleGrader, check_grades  # noqa: E402
+from ratelimit import TokenBucket  # noqa: E402
+
+CACHE_FILE = PROJECT_ROOT / ".cache" / "grades.sqlite"
+RULES_OUTPUT_DIR = PROJECT_ROOT / ".cache" / "graded-rules"
+DEFAULT_MODEL = "gemini-2.5-flash"
+WORKERS = 4
+REQUESTS_PER_MINUTE = 10
+RETRIES = 3
+RETRY_BACKOFF_S = 20
+
+
+class GradingError(Exception):
+    pass
+
+
+def cache_key(event) -> str:
+    """What a grade depends on besides the grader: the visible fields and the current label."""
+    return f"{content_hash(event)}/{event.get('current_difficulty')}"
+
+
+class GradeCache:
+    """Thread-safe SQLite store of grades keyed by (grader, version, `cache_key`)."""
+
+    def __init__(self, path: Path = CACHE_FILE):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS grade_cache (
+                grader TEXT NOT NULL,
+                version TEXT NOT NULL,
+                key TEXT NOT NULL,
+                entry TEXT NOT NULL,
+                graded_at REAL NOT NULL,
+                PRIMARY KEY (grader, version, key)
+            )"""
+        )
+        self._db.commit()
+
+    def get_many(self, grader, keys: list[str]) -> dict[str, dict]:
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._db.execute(
+                    f"SELECT key, entry FROM grade_cache WHERE grader = ? AND version = ? AND key IN ({','.join('?' * len(chunk))})",
+                    (grader.name, grader.version, *chunk),
+                ).fetchall()
+                found.update((key, json.loads(entry)) for key, entry in rows)
+        return found
+
+    def put_many(self, grader, entries: dict[str, dict]):
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO grade_cache (grader, version, key, entry, graded_at) VALUES (?, ?, ?, ?, ?)",
+                [(grader.name, grader.version, key, json.dumps(entry, ensure_ascii=False), now) for key, entry in entries.items()],
+            )
+            self._db.commit()
+
+
+def grade_batch(batch, grader, cache, bucket, args):
+    """Grade one batch and write its graded file. Returns a summary dict."""
+    name = batch["batch"]
+    grader_id = f"{grader.name}:{grader.version}"
+    target = args.output_dir / f"graded_{name}.json"
+    summary = {"batch": name, "events": len(batch["events"]), "cached": 0, "calls": 0, "status": "written"}
+
+    if target.exists() and not args.overwrite:
+        with open(target, encoding="utf-8") as f:
+            try:
+                existing = json.load(f)
+            except json.JSONDecodeError as exc:
+                raise GradingError(f"{target.name} is not valid JSON ({exc}); fix it or rerun with --overwrite") from exc
+        owner = existing.get("grader") if isinstance(existing, dict) else None
+        if owner != grader_id:
+            summary["status"] = f"kept (graded by {owner or 'hand'})"
+            return summary
+
+    keys = {event["name"]: cache_key(event) for event in batch["events"]}
+    grades = cache.get_many(grader, list(keys.values()))
+    summary["cached"] = len(grades)
+    todo = [event for event in batch["events"] if keys[event["name"]] not in grades]
+    if todo and args.offline:
+        raise GradingError(f"{len(todo)} event(s) not in the grade cache: {', '.join(e['name'] for e in todo[:5])}")
+
+    problems = []
+    for attempt in range(RETRIES + 1):
+        if not todo:
+            break
+        if grader.remote:
+            bucket.acquire()
+        summary["calls"] += 1
+        try:
+            graded = grader.grade(batch, todo)
+        except Exception as exc:
+            problems = [f"{type(exc).__name__}: {exc}"]
+            if grader.remote:
+                bucket.pause(RETRY_BACKOFF_S * 2 ** attempt)
+            continue
+        good, problems = check_grades(todo, graded)
+        fresh = {keys[n]: entry for n, entry in good.items()}
+        cache.put_many(grader, fresh)
+        grades.update(fresh)
+        todo = [event for event in todo if event["name"] not in good]
+    if todo:
+        raise GradingError("; ".join(problems[:5]) or f"{len(todo)} event(s) left ungraded")
+
+    payload = {
+        "batch": name,
+        "category": batch["category"],
+        "grader": grader_id,
+        "graded": [grades[keys[event["name"]]] for event in batch["events"]],
+    }
+    event_store.write_atomic(target, json.dumps(payload, indent=2, ensure_ascii=False) + "\n")
+    return summary
+
+
+def make_grader(args):
+    if args.grader == "rules":
+        return RuleGrader()
+    return GeminiGrader(os.environ.get("GEMINI_API_KEY"), args.model)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--grader", choices=["rules", "gemini"], default="gemini", help="grader backend (default: gemini)")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help=f"Gemini model (default: {DEFAULT_MODEL})")
+    parser.add_argument("--workers", type=int, default=WORKERS, help=f"batches graded at once (default: {WORKERS})")
+    parser.add_argument("--rpm", type=float, default=REQUESTS_PER_MINUTE, help=f"grader calls per minute (default: {REQUESTS_PER_MINUTE})")
+    parser.add_argument("--offline", action="store_true", help="replay from the grade cache only; never call the grader")
+    parser.add_argument("--overwrite", action="store_true", help="replace graded files written by another grader or by hand")
+    parser.add_argument("--output-dir", type=Path, help="where graded files go (default: output/, or .cache/graded-rules/ for --grader rules)")
+    args = parser.parse_args()
+    if args.output_dir is None:
+        args.output_dir = RULES_OUTPUT_DIR if args.grader == "rules" else OUTPUT_DIR
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+
+    batches = read_batches()
+    if not batches:
+        print("No batches to grade; run extract_batches.py first.", file=sys.stderr)
+        return 1
+    grader = make_grader(args)
+    cache = GradeCache()
+    bucket = TokenBucket(args.rpm / 60)
+
+    print(f"Grading {len(batches)} batch(es) with {grader.name} {grader.version}"
+          f"{' (offline replay)' if args.offline else ''} -> {args.output_dir}\n")
+    started = time.monotonic()
+    failed = []
+    totals = {"events": 0, "cached": 0, "calls": 0}
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(grade_batch, batch, grader, cache, bucket, args): name for name, batch in batches.items()}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                summary = future.result()
+            except GradingError as exc:
+                failed.append(name)
+                print(f"  ✗ {name}: {exc}")
+                continue
+            for key in totals:
+                totals[key] += summary[key]
+            print(f"  ✓ {name:24}{summary['events']:>5} events{summary['cached']:>6} cached"
+                  f"{summary['calls']:>4} call(s)  {summary['status']}")
+
+    elapsed = time.monotonic() - started
+    print(f"\n{len(batches) - len(failed)}/{len(batches)} batches in {elapsed:.1f}s; "
+          f"{totals['cached']} of {totals['events']} grades from cache, {totals['calls']} grader call(s)")
+    if failed:
+        names = sorted(failed)
+        print(f"Failed: {', '.join(names[:10])}{' ...' if len(names) > 10 else ''}. "
+              "Rerun to retry; finished grades are cached.")
+        return 1
+
+    try:
+        grades, _by_batch = read_graded(batches, args.output_dir)
+    except ValidationError as exc:
+        print(f"\nGraded files do not validate:\n{exc}", file=sys.stderr)
+        return 1
+    print(f"{len(grades)} grades validate against apply.py's schema.")
+    if args.output_dir == OUTPUT_DIR:
+        print("Next: python3 scripts/difficulty/grade/apply.py --dry-run")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
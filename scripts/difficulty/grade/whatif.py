@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""Preview what relabelling events does to the bands, without rescoring from scratch.
+
+Changing one event's `difficulty` moves only that event's score (years, and so every
+density, are untouched), but it can shift the global quartile cuts, and with them the
+band of any event sitting between an old cut and its new one. `IncrementalScorer`
+tracks exactly that:
+
+- every possible score is known up front, since a score is fixed by (label, density)
+  and the densities cannot change; they are kept sorted as a small domain
+- a Fenwick tree over that domain counts events per score, so the k-th smallest score
+  (a quartile cut) is an O(log m) query after an O(log m) update
+- events are bucketed by score, so the events a moved cut can flip are found by
+  visiting only the buckets between its old and new position
+
+An edit therefore costs a few tree operations plus the events whose band actually
+flips, well under a millisecond on the full catalogue, and the bands it maintains are
+always those `score_catalogue` would compute from scratch.
+
+Usage:
+    python3 scripts/difficulty/grade/whatif.py some-event=hard other-event=easy
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from catalogue import (  # noqa: E402
+    DIFFICULTIES,
+    RECOGNITION_RANK,
+    W_RECOGNITION,
+    CatalogueArrays,
+    load_catalogue,
+    placeability,
+    score_arrays,
+)
+
+QUARTILES = (0.25, 0.5, 0.75)
+
+
+class FenwickTree:
+    """Counts over 0..size-1 with prefix sums and k-th element lookup."""
+
+    def __init__(self, counts):
+        self.size = len(counts)
+        self.tree = [0] * (self.size + 1)
+        for i, count in enumerate(counts):
+            self.add(i, count)
+        self.top = 1 << max(0, self.size.bit_length() - 1)
+
+    def add(self, i, delta):
+        i += 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def kth(self, k):
+        """Smallest index whose prefix count exceeds k, i.e. the k-th item (0-based)."""
+        pos = 0
+        step = self.top
+        while step:
+            nxt = pos + step
+            if nxt <= self.size and self.tree[nxt] <= k:
+                pos = nxt
+                k -= self.tree[nxt]
+            step >>= 1
+        return pos
+
+
+class IncrementalScorer:
+    """Bands for a deduped catalogue, kept current under `difficulty` edits."""
+
+    def __init__(self, events):
+        columns = CatalogueArrays(events)
+        _u, density, score, band = score_arrays(columns)
+        self.names = columns.names
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.categories = list(columns.categories)
+        self.category_codes = columns.category_codes.tolist()
+        self.labels = [columns.labels[code] for code in columns.label_codes.tolist()]
+        self.n = len(self.names)
+
+        # The score domain: every (recognition, placeability) pair the catalogue allows,
+        # computed with the same float64 expression as score_arrays.
+        self._placeability = placeability(density).tolist()
+        ranks = set(RECOGNITION_RANK.values()) | {0.5}
+        domain = sorted({W_RECOGNITION * r + (1 - W_RECOGNITION) * p for r in ranks for p in set(self._placeability)})
+        self.domain = domain
+        self._slot = {value: i for i, value in enumerate(domain)}
+
+        self.value = [self._slot[s] for s in score.tolist()]
+        self.buckets = [set() for _ in domain]
+        for i, v in enumerate(self.value):
+            self.buckets[v].add(i)
+        self.tree = FenwickTree([len(b) for b in self.buckets])
+        self.cuts = self._cuts()
+        self.band = band.tolist()
+        self.band_counts = np.zeros((len(self.categories), 4), dtype=np.int64)
+        np.add.at(self.band_counts, (columns.category_codes, band), 1)
+
+    def _score(self, i, label):
+        return W_RECOGNITION * RECOGNITION_RANK.get(label, 0.5) + (1 - W_RECOGNITION) * self._placeability[i]
+
+    def _cuts(self):
+        return [self.tree.kth(min(self.n - 1, int(self.n * p))) for p in QUARTILES]
+
+    def _band_of(self, v):
+        c1, c2, c3 = self.cuts
+        return (v >= c1) + (v >= c2) + (v >= c3)
+
+    def _reband(self, i):
+        new = self._band_of(self.value[i])
+        old = self.band[i]
+        if new != old:
+            self.band[i] = new
+            self.band_counts[self.category_codes[i], old] -= 1
+            self.band_counts[self.category_codes[i], new] += 1
+            return (self.names[i], old, new)
+        return None
+
+    def set_difficulty(self, name, difficulty):
+        """Relabel one event. Returns [(name, old band, new band)] for every band that flipped."""
+        i = self.index[name]
+        self.labels[i] = difficulty
+        old_v, new_v = self.value[i], self._slot[self._score(i, difficulty)]
+        if old_v == new_v:
+            return []
+        self.buckets[old_v].discard(i)
+        self.buckets[new_v].add(i)
+        self.tree.add(old_v, -1)
+        self.tree.add(new_v, 1)
+        self.value[i] = new_v
+
+        old_cuts, self.cuts = self.cuts, self._cuts()
+        touched = {i}
+        for before, after in zip(old_cuts, self.cuts):
+            for v in range(min(before, after), max(before, after) + 1):
+                touched |= self.buckets[v]
+        return [flip for j in sorted(touched) if (flip := self._reband(j))]
+
+    def min_band0(self):
+        """(smallest band-0 pool, its category)."""
+        c = int(np.argmin(self.band_counts[:, 0]))
+        return int(self.band_counts[c, 0]), self.categories[c]
+
+    def preview(self, name, difficulty):
+        """What relabelling `name` would do, leaving the scorer unchanged.
+
+        Returns {"flips", "min_band0", "category", "band0_delta"} where band0_delta maps
+        each category whose band-0 pool would change to the change.
+        """
+        before_band0 = self.band_counts[:, 0].copy()
+        old_label = self.labels[self.index[name]]
+        flips = self.set_difficulty(name, difficulty)
+        floor, category = self.min_band0()
+        delta = self.band_counts[:, 0] - before_band0
+        self.set_difficulty(name, old_label)
+        return {
+            "flips": flips,
+            "min_band0": floor,
+            "category": category,
+            "band0_delta": {self.categories[c]: int(delta[c]) for c in np.flatnonzero(delta).tolist()},
+        }
+
+    def score(self, name):
+        return self.domain[self.value[self.index[name]]]
+
+    def quartiles(self):
+        """The current q1, q2, q3 score cuts."""
+        return [self.domain[v] for v in self.cuts]
+
+    def metrics(self):
+        """{name: band}, for checking against score_catalogue."""
+        return dict(zip(self.names, self.band))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("edits", nargs="+", metavar="NAME=DIFFICULTY", help="relabellings to preview, applied in order")
+    args = parser.parse_args()
+
+    scorer = IncrementalScorer(load_catalogue())
+    floor, category = scorer.min_band0()
+    print(f"min band-0 pool now: {floor} ({category})\n")
+
+    for edit in args.edits:
+        name, _, difficulty = edit.partition("=")
+        if name not in scorer.index:
+            print(f"{name}: not in the playable catalogue", file=sys.stderr)
+            return 1
+        if difficulty not in DIFFICULTIES:
+            print(f"{name}: {difficulty!r} is not one of {DIFFICULTIES}", file=sys.stderr)
+            return 1
+        started = time.perf_counter()
+        result = scorer.preview(name, difficulty)
+        elapsed = (time.perf_counter() - started) * 1000
+        changes = ", ".join(f"{c} {d:+d}" for c, d in sorted(result["band0_delta"].items())) or "none"
+        print(f"{name}: {scorer.labels[scorer.index[name]]} -> {difficulty}  ({elapsed:.2f} ms)")
+        print(f"  {len(result['flips'])} band flip(s); band-0 changes: {changes}")
+        print(f"  min band-0 pool would be {result['min_band0']} ({result['category']})")
+        scorer.set_difficulty(name, difficulty)  # later edits build on this one
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
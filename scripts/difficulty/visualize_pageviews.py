@@ -4,11 +4,15 @@ Visualize Wikipedia pageviews distribution for historical events.
 Creates a CSV export and histogram of the pageview distribution.
 """
 
-import json
 import csv
 import os
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import event_store  # noqa: E402
+
 # Try to import matplotlib, provide helpful message if not installed
 try:
     import matplotlib.pyplot as plt
@@ -20,23 +24,12 @@ except ImportError:
 
 # Paths
 SCRIPT_DIR = Path(__file__).parent
-PROJECT_ROOT = SCRIPT_DIR.parent.parent
-EVENTS_DIR = PROJECT_ROOT / "public" / "events"
 OUTPUT_DIR = SCRIPT_DIR / "output"
 
 def load_all_events():
     """Load all events from JSON files."""
-    events = []
-    json_files = [f for f in EVENTS_DIR.glob("*.json") if f.name != "manifest.json"]
-
-    for json_file in json_files:
-        with open(json_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            for event in data:
-                event["_source_file"] = json_file.name
-            events.extend(data)
-
-    return events
+    catalogue = event_store.load(include_unlisted=True)
+    return [{**event, "_source_file": catalogue.file_of(event)} for event in catalogue.events]
 
 def export_csv(events, output_path):
     """Export events to CSV with name, url, views."""
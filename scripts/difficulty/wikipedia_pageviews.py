@@ -5,9 +5,32 @@ Wikipedia Pageviews Script
 Looks up Wikipedia pageviews for historical events and adds them to event JSON files.
 More pageviews = more well-known event (useful for difficulty metrics).
 
+Lookups run on a thread pool. Requests are paced by token buckets sized to the API
+quotas rather than by per-call sleeps, and a 429 pauses every worker until its
+Retry-After has passed.
+
+With --monthly, views are the sum of the last 12 complete calendar months, fetched at
+monthly granularity and kept per article in a local store. A later --refresh asks only
+for the months the store does not have yet: one small request per article, or none at
+all if nothing new has closed.
+
+Before any full-text search, events are matched to articles by exact title in batches:
+one `titles=A|B|...` query (redirects followed, disambiguation pages rejected) checks
+50 candidate titles built from each event's friendly_name and slug. Only the events
+that match nothing fall back to one `list=search` call each.
+
+Every result is appended to a journal (.cache/wikipedia_pageviews.journal.jsonl) and
+flushed to disk as it lands. The event files are only rewritten once, at the end of
+the run; if the run dies first, the next one replays the journal and resumes from the
+first event that has no result, instead of redoing the whole file.
+
 Usage:
-    python scripts/difficulty/wikipedia_pageviews.py           # Process all events
-    python scripts/difficulty/wikipedia_pageviews.py --test    # Test with sample events
+    python scripts/difficulty/wikipedia_pageviews.py                # Process all events
+    python scripts/difficulty/wikipedia_pageviews.py --monthly      # Same, via monthly totals
+    python scripts/difficulty/wikipedia_pageviews.py --refresh      # Update every event's views
+    python scripts/difficulty/wikipedia_pageviews.py --search-only  # Skip batch title matching
+    python scripts/difficulty/wikipedia_pageviews.py --workers 4    # Fewer concurrent lookups
+    python scripts/difficulty/wikipedia_pageviews.py --test         # Test with sample events
 """
 
 import argparse
@@ -15,30 +38,59 @@ import json
 import logging
 import os
 import requests
+import sqlite3
 import sys
+import threading
 import time
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from urllib.parse import quote
+from urllib.parse import quote, unquote
 
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import event_store  # noqa: E402
+from event_store import EVENTS_DIR  # noqa: E402
+from http_cache import default_cache  # noqa: E402
+from ratelimit import TokenBucket, retry_after_seconds  # noqa: E402
+
 # Load .env file from project root
 ENV_PATH = Path(__file__).parent.parent.parent / ".env"
 load_dotenv(ENV_PATH)
 
 # Configuration
 USER_AGENT = "WhenGame/1.0 (difficulty-metric-script; github.com/timeline/when)"
-EVENTS_DIR = Path(__file__).parent.parent.parent / "public" / "events"
 LOG_DIR = Path(__file__).parent.parent.parent / "logs"
 PAGEVIEW_DAYS = 365  # Look at last year of pageviews
-REQUEST_DELAY = 0.5  # Seconds between API calls
+PAGEVIEW_MONTHS = 12  # Same year, as complete calendar months (--monthly)
+MONTHLY_STORE = Path(__file__).parent.parent.parent / ".cache" / "pageview_months.sqlite"
+JOURNAL_FILE = Path(__file__).parent.parent.parent / ".cache" / "wikipedia_pageviews.journal.jsonl"
 MAX_RETRIES = 3  # Retry on rate limit
-RATE_LIMIT_WAIT = 60  # Seconds to wait when rate limited
+RATE_LIMIT_WAIT = 60  # Seconds to wait when rate limited (if no Retry-After)
+MAX_WORKERS = 8  # Concurrent lookups; the token buckets, not the pool, set the pace
+
+# Request budgets. The pageviews REST API quota depends on whether we authenticate;
+# the MediaWiki Action API used for search has no published hourly quota, so it gets
+# a polite fixed rate of its own.
+AUTH_REQUESTS_PER_HOUR = 5000
+ANON_REQUESTS_PER_HOUR = 500
+SEARCH_REQUESTS_PER_SECOND = 5
+TITLES_PER_QUERY = 50  # MediaWiki's cap on titles= for unprivileged clients
+
+# HTTP cache lifetimes. Pageview URLs name their date window, so a cached answer for
+# one stays correct; search rankings drift, so re-ask after a week.
+PAGEVIEW_CACHE_TTL = 30 * 24 * 3600
+SEARCH_CACHE_TTL = 7 * 24 * 3600
 
 # API token from .env file (optional, but gives 10x higher rate limit)
 WIKI_ACCESS_TOKEN = os.environ.get("WIKI_ACCESS_TOKEN")
 
+pageview_bucket = TokenBucket.per_hour(AUTH_REQUESTS_PER_HOUR if WIKI_ACCESS_TOKEN else ANON_REQUESTS_PER_HOUR)
+search_bucket = TokenBucket(SEARCH_REQUESTS_PER_SECOND)
+_auth_lock = threading.Lock()
+
 
 def setup_logging():
     """Setup logging to both console and file."""
@@ -70,9 +122,24 @@ def setup_logging():
 log = None  # Global logger, initialized in main
 
 
-def make_request_with_retry(url: str, params: dict = None, max_retries: int = MAX_RETRIES, use_auth: bool = True) -> requests.Response | None:
-    """Make an HTTP request with retry logic for rate limiting."""
-    global _auth_disabled
+def make_request_with_retry(
+    url: str,
+    params: dict = None,
+    max_retries: int = MAX_RETRIES,
+    use_auth: bool = True,
+    bucket: TokenBucket = pageview_bucket,
+    ttl: float = PAGEVIEW_CACHE_TTL,
+) -> requests.Response | None:
+    """Make an HTTP request paced by `bucket`, with retry logic for rate limiting.
+
+    Safe to call from many threads at once. A 429 pauses the shared bucket for the
+    server's Retry-After, so every worker on that API backs off together. Responses
+    go through the shared HTTP cache; a fresh hit spends no budget at all.
+    """
+    cache = default_cache()
+    cached = cache.fresh(url, params)
+    if cached is not None:
+        return cached
 
     headers = {"User-Agent": USER_AGENT}
     # Only use auth if enabled and not previously disabled due to 403
@@ -80,26 +147,24 @@ def make_request_with_retry(url: str, params: dict = None, max_retries: int = MA
         headers["Authorization"] = f"Bearer {WIKI_ACCESS_TOKEN}"
 
     for attempt in range(max_retries):
+        bucket.acquire()
         try:
-            response = requests.get(url, params=params, headers=headers)
+            response = cache.get(url, params=params, headers=headers, ttl=ttl, timeout=30)
 
             # Handle 403 - token might be invalid, retry without auth
             if response.status_code == 403 and "Authorization" in headers:
-                if log:
-                    log.info("   [AUTH ERROR] Token rejected, falling back to unauthenticated mode")
-                else:
-                    print("   [AUTH ERROR] Token rejected, falling back to unauthenticated mode")
-                make_request_with_retry._auth_disabled = True
+                with _auth_lock:
+                    if not getattr(make_request_with_retry, '_auth_disabled', False):
+                        _log("   [AUTH ERROR] Token rejected, falling back to unauthenticated mode")
+                        make_request_with_retry._auth_disabled = True
+                        bucket.set_rate(ANON_REQUESTS_PER_HOUR / 3600)
                 del headers["Authorization"]
                 continue
 
             if response.status_code == 429:
-                retry_after = int(response.headers.get("Retry-After", RATE_LIMIT_WAIT))
-                if log:
-                    log.info(f"   [RATE LIMITED] Waiting {retry_after}s (attempt {attempt + 1}/{max_retries})")
-                else:
-                    print(f"   [RATE LIMITED] Waiting {retry_after}s (attempt {attempt + 1}/{max_retries})")
-                time.sleep(retry_after)
+                retry_after = retry_after_seconds(response.headers, RATE_LIMIT_WAIT)
+                _log(f"   [RATE LIMITED] Pausing all workers {retry_after:.0f}s (attempt {attempt + 1}/{max_retries})")
+                bucket.pause(retry_after)
                 continue
 
             response.raise_for_status()
@@ -109,12 +174,19 @@ def make_request_with_retry(url: str, params: dict = None, max_retries: int = MA
             if "429" not in str(e):
                 raise
             # Already handled above, but just in case
-            time.sleep(RATE_LIMIT_WAIT)
+            bucket.pause(RATE_LIMIT_WAIT)
             continue
 
     return None
 
 
+def _log(message: str):
+    if log:
+        log.info(message)
+    else:
+        print(message)
+
+
 def search_wikipedia(query: str) -> list[dict] | None:
     """Search Wikipedia for articles matching the query.
 
@@ -132,7 +204,7 @@ def search_wikipedia(query: str) -> list[dict] | None:
 
     try:
         # Use make_request_with_retry but without auth (not needed for this API)
-        response = make_request_with_retry(url, params, use_auth=False)
+        response = make_request_with_retry(url, params, use_auth=False, bucket=search_bucket, ttl=SEARCH_CACHE_TTL)
         if response is None:
             print(f"  Search failed after {MAX_RETRIES} retries")
             return None
@@ -154,6 +226,71 @@ def search_wikipedia(query: str) -> list[dict] | None:
         return None
 
 
+def resolve_titles(titles: list[str], workers: int = MAX_WORKERS) -> tuple[dict[str, str], int]:
+    """Resolve exact article titles in batches of TITLES_PER_QUERY, following redirects.
+
+    Returns ({requested title: article title}, requests made). Titles that are missing,
+    invalid or land on a disambiguation page are left out, so the caller can fall back
+    to full-text search for them.
+    """
+    # "|" separates titles in the query and cannot appear in one.
+    unique = sorted({t for t in titles if t and "|" not in t})
+    chunks = [unique[i:i + TITLES_PER_QUERY] for i in range(0, len(unique), TITLES_PER_QUERY)]
+
+    def query(chunk):
+        params = {
+            "action": "query",
+            "titles": "|".join(chunk),
+            "redirects": 1,
+            "prop": "pageprops",
+            "ppprop": "disambiguation",
+            "format": "json",
+            "formatversion": 2,
+        }
+        try:
+            response = make_request_with_retry(
+                "https://en.wikipedia.org/w/api.php", params, use_auth=False, bucket=search_bucket, ttl=SEARCH_CACHE_TTL
+            )
+            if response is None:
+                return {}
+            data = response.json().get("query", {})
+        except Exception as e:
+            print(f"  Title resolution error: {e}")
+            return {}
+
+        renamed = {n["from"]: n["to"] for n in data.get("normalized", [])}
+        redirected = {r["from"]: r["to"] for r in data.get("redirects", [])}
+        articles = {
+            page["title"]
+            for page in data.get("pages", [])
+            if not page.get("missing") and not page.get("invalid") and "disambiguation" not in page.get("pageprops", {})
+        }
+        resolved = {}
+        for title in chunk:
+            target = renamed.get(title, title)
+            target = redirected.get(target, target)
+            if target in articles:
+                resolved[title] = target
+        return resolved
+
+    resolved = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for batch in pool.map(query, chunks):
+            resolved.update(batch)
+    return resolved, len(chunks)
+
+
+def title_candidates(event: dict) -> list[str]:
+    """Article titles an event plausibly maps to directly, best first."""
+    candidates = []
+    if event.get("friendly_name"):
+        candidates.append(event["friendly_name"])
+    if event.get("name"):
+        slug_title = event["name"].replace("-", " ")
+        candidates.append(slug_title[:1].upper() + slug_title[1:])
+    return list(dict.fromkeys(candidates))
+
+
 def get_pageviews(article_title: str) -> int | None:
     """Get total pageviews for a Wikipedia article over the last year."""
     encoded_title = quote(article_title.replace(" ", "_"), safe="")
@@ -182,13 +319,119 @@ def get_pageviews(article_title: str) -> int | None:
         return None
 
 
+def _months_back(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 - count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _last_complete_month() -> date:
+    return _months_back(date.today().replace(day=1), 1)
+
+
+class MonthlyPageviewStore:
+    """Per-article monthly view counts, so a refresh only fetches months not yet seen.
+
+    Months are stored as `YYYYMM` strings. A month the API returns no row for is stored
+    as zero, so it is not asked for again.
+    """
+
+    def __init__(self, path: Path = MONTHLY_STORE):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS months (article TEXT, month TEXT, views INTEGER, PRIMARY KEY (article, month))"
+        )
+        self._db.commit()
+        self._lock = threading.Lock()
+
+    def latest(self, article: str) -> str | None:
+        with self._lock:
+            return self._db.execute("SELECT MAX(month) FROM months WHERE article = ?", (article,)).fetchone()[0]
+
+    def add(self, article: str, views_by_month: dict[str, int]):
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO months VALUES (?, ?, ?)",
+                [(article, month, views) for month, views in views_by_month.items()],
+            )
+            self._db.commit()
+
+    def total(self, article: str, first: str, last: str) -> int:
+        with self._lock:
+            return self._db.execute(
+                "SELECT COALESCE(SUM(views), 0) FROM months WHERE article = ? AND month BETWEEN ? AND ?",
+                (article, first, last),
+            ).fetchone()[0]
+
+
+_monthly_store = None
+
+
+def monthly_store() -> MonthlyPageviewStore:
+    global _monthly_store
+    if _monthly_store is None:
+        _monthly_store = MonthlyPageviewStore()
+    return _monthly_store
+
+
+def get_monthly_pageviews(article_title: str) -> int | None:
+    """Get pageviews over the last PAGEVIEW_MONTHS complete months.
+
+    Only the months newer than the latest one stored for this article are requested,
+    so once an article is known a refresh costs at most one request, and none when no
+    new month has closed since the last run.
+    """
+    article = article_title.replace(" ", "_")
+    store = monthly_store()
+
+    last = _last_complete_month()
+    first = _months_back(last, PAGEVIEW_MONTHS - 1)
+    window = (first.strftime("%Y%m"), last.strftime("%Y%m"))
+
+    latest = store.latest(article)
+    if latest is None or latest < window[0]:
+        fetch_from = first
+    else:
+        fetch_from = _months_back(datetime.strptime(latest, "%Y%m").date(), -1)
+
+    if fetch_from <= last:
+        last_day = _months_back(last, -1) - timedelta(days=1)
+        url = (
+            f"https://wikimedia.org/api/rest_v1/metrics/pageviews/per-article/"
+            f"en.wikipedia/all-access/user/{quote(article, safe='')}/monthly/"
+            f"{fetch_from.strftime('%Y%m%d')}00/{last_day.strftime('%Y%m%d')}00"
+        )
+        try:
+            response = make_request_with_retry(url)
+            if response is None:
+                print(f"  Pageview lookup failed after {MAX_RETRIES} retries")
+                return None
+            fetched = {
+                item["timestamp"][:6]: item["views"]
+                for item in response.json().get("items", [])
+                if item["timestamp"][:6] <= window[1]
+            }
+        except Exception as e:
+            print(f"  Pageview error for '{article_title}': {e}")
+            return None
+
+        month = fetch_from
+        while month <= last:
+            key = month.strftime("%Y%m")
+            fetched.setdefault(key, 0)
+            month = _months_back(month, -1)
+        store.add(article, fetched)
+
+    return store.total(article, *window)
+
+
 def get_wikipedia_url(article_title: str) -> str:
     """Generate Wikipedia URL from article title."""
     encoded_title = article_title.replace(" ", "_")
     return f"https://en.wikipedia.org/wiki/{encoded_title}"
 
 
-def get_event_pageviews(friendly_name: str) -> tuple[int | None, str | None, str | None]:
+def get_event_pageviews(friendly_name: str, monthly: bool = False) -> tuple[int | None, str | None, str | None]:
     """
     Search Wikipedia for an event and return its pageviews.
     Returns (pageviews, article_title, wikipedia_url) tuple.
@@ -199,45 +442,94 @@ def get_event_pageviews(friendly_name: str) -> tuple[int | None, str | None, str
         return None, None, None
 
     # Use the top result
-    top_article = search_results[0]["title"]
-    views = get_pageviews(top_article)
-    url = get_wikipedia_url(top_article)
+    return get_article_pageviews(search_results[0]["title"], monthly=monthly)
+
+
+def get_article_pageviews(article: str, monthly: bool = False) -> tuple[int | None, str, str]:
+    """Pageviews for an already-identified article, as a (views, article, url) tuple."""
+    views = get_monthly_pageviews(article) if monthly else get_pageviews(article)
+    return views, article, get_wikipedia_url(article)
 
-    return views, top_article, url
 
+def refresh_event_pageviews(wikipedia_url: str) -> tuple[int | None, str | None, str | None]:
+    """Re-count views for an event's already-chosen article, monthly and incrementally."""
+    article = unquote(wikipedia_url.rsplit("/wiki/", 1)[-1])
+    return get_monthly_pageviews(article), article, wikipedia_url
+
+
+def replay_journal(events_by_file: dict[Path, list]) -> tuple[set[tuple[str, str]], set[Path]]:
+    """Apply results journalled by an interrupted run to the loaded events.
+
+    Returns the (file name, event name) pairs that already have a result and the files
+    those results changed. A torn final line from a crash mid-write is ignored.
+    """
+    done = set()
+    modified = set()
+    if not JOURNAL_FILE.exists():
+        return done, modified
+
+    by_key = {
+        (json_file.name, event.get("name")): (json_file, event)
+        for json_file, events in events_by_file.items()
+        for event in events
+    }
+    with open(JOURNAL_FILE, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            key = (record["file"], record["name"])
+            if key not in by_key:
+                continue
+            json_file, event = by_key[key]
+            if event.get("wikipedia_views") != record["views"] or event.get("wikipedia_url") != record["url"]:
+                event["wikipedia_views"] = record["views"]
+                event["wikipedia_url"] = record["url"]
+                modified.add(json_file)
+            done.add(key)
+    return done, modified
 
-def load_events(file_path: Path) -> list:
-    """Load events from a JSON file."""
-    with open(file_path) as f:
-        return json.load(f)
 
+def append_journal(journal, json_file: Path, event: dict, article: str, views: int, url: str):
+    """Durably record one result before moving on to the next."""
+    record = {"file": json_file.name, "name": event.get("name"), "article": article, "views": views, "url": url}
+    journal.write(json.dumps(record, ensure_ascii=False) + "\n")
+    journal.flush()
+    os.fsync(journal.fileno())
 
-def save_events(file_path: Path, events: list):
-    """Save events to a JSON file with nice formatting."""
-    with open(file_path, "w") as f:
-        json.dump(events, f, indent=2, ensure_ascii=False)
-        f.write("\n")
 
+def process_all_events(workers: int = MAX_WORKERS, monthly: bool = False, refresh: bool = False, search_only: bool = False):
+    """Process all events in all JSON files and add wikipedia_views field.
 
-def process_all_events():
-    """Process all events in all JSON files and add wikipedia_views field."""
-    json_files = list(EVENTS_DIR.glob("*.json"))
-    json_files = [f for f in json_files if f.name != "manifest.json"]
+    Every pending lookup across every file goes onto one thread pool. Results go to
+    the journal as they arrive; the event files are compacted from memory once, after
+    the pool drains, and the journal is then removed.
 
-    # Count total events for progress
-    total_event_count = sum(len(load_events(f)) for f in json_files)
+    With `refresh`, events that already have a `wikipedia_url` are re-counted against
+    that article (monthly, incrementally) instead of being skipped. Unless
+    `search_only`, events needing a search are first matched by exact title in batches.
+    """
+    monthly = monthly or refresh
+    catalogue = event_store.load(include_unlisted=True)
+    json_files = [EVENTS_DIR / filename for filename in catalogue.files]
 
     log.info("=" * 60)
     log.info("Wikipedia Pageviews - Processing All Events")
     log.info("=" * 60)
     if WIKI_ACCESS_TOKEN:
-        log.info("Using API token (5,000 requests/hour limit)")
+        log.info(f"Using API token ({AUTH_REQUESTS_PER_HOUR:,} requests/hour limit)")
     else:
-        log.info("No API token - using unauthenticated access (500 requests/hour limit)")
+        log.info(f"No API token - using unauthenticated access ({ANON_REQUESTS_PER_HOUR:,} requests/hour limit)")
         log.info("Set WIKI_ACCESS_TOKEN env var for higher limits")
     log.info(f"Events directory: {EVENTS_DIR}")
     log.info(f"Files to process: {[f.name for f in json_files]}")
+
+    events_by_file = {EVENTS_DIR / filename: events for filename, events in catalogue.files.items()}
+    total_event_count = sum(len(events) for events in events_by_file.values())
     log.info(f"Total events: {total_event_count}")
+    log.info(f"Workers: {workers}")
+    log.info(f"Window: last {PAGEVIEW_MONTHS} complete months" if monthly else f"Window: last {PAGEVIEW_DAYS} days")
     log.info("")
 
     processed = 0
@@ -245,44 +537,87 @@ def process_all_events():
     failed = 0
     skipped = 0
 
-    for json_file in json_files:
-        log.info(f"\n{'='*60}")
-        log.info(f"Processing: {json_file.name}")
-        log.info("=" * 60)
-
-        events = load_events(json_file)
-        modified = False
+    resumed, modified = replay_journal(events_by_file)
+    if resumed:
+        log.info(f"Resuming: {len(resumed)} results replayed from {JOURNAL_FILE.name}")
 
+    pending = []
+    for json_file, events in events_by_file.items():
         for event in events:
-            friendly_name = event.get("friendly_name", event.get("name", ""))
-            processed += 1
-            progress = f"[{processed}/{total_event_count}]"
-
-            # Skip if already has pageviews
+            if (json_file.name, event.get("name")) in resumed:
+                processed += 1
+                successful += 1
+                continue
+            if refresh and event.get("wikipedia_url"):
+                pending.append((json_file, event))
+                continue
             if "wikipedia_views" in event:
-                log.info(f"{progress} [SKIP] {friendly_name} (already has data)")
+                processed += 1
                 skipped += 1
                 continue
+            pending.append((json_file, event))
+    log.info(f"Skipping {skipped} events that already have data, looking up {len(pending)}")
+
+    needs_search = [event for _file, event in pending if not (refresh and event.get("wikipedia_url"))]
+    resolved = {}
+    if needs_search and not search_only:
+        candidates = {id(event): title_candidates(event) for event in needs_search}
+        matches, batch_requests = resolve_titles([t for ts in candidates.values() for t in ts], workers)
+        for event in needs_search:
+            article = next((matches[t] for t in candidates[id(event)] if t in matches), None)
+            if article:
+                resolved[id(event)] = article
+        # One search per event is the baseline; resolution spends batch requests to skip some.
+        lookups = batch_requests + len(needs_search) - len(resolved)
+        log.info(
+            f"Title resolution: {len(resolved)}/{len(needs_search)} events matched by exact title "
+            f"in {batch_requests} batch requests; {lookups} title lookups in all, against "
+            f"{len(needs_search)} searching alone"
+        )
+
+    def lookup(event):
+        if refresh and event.get("wikipedia_url"):
+            return refresh_event_pageviews(event["wikipedia_url"])
+        if id(event) in resolved:
+            return get_article_pageviews(resolved[id(event)], monthly=monthly)
+        return get_event_pageviews(event.get("friendly_name", event.get("name", "")), monthly=monthly)
+
+    started = time.monotonic()
+    JOURNAL_FILE.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(JOURNAL_FILE, "a", encoding="utf-8") as journal, ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(lookup, event): (json_file, event)
+            for json_file, event in pending
+        }
+        for future in as_completed(futures):
+            json_file, event = futures[future]
+            friendly_name = event.get("friendly_name", event.get("name", ""))
+            processed += 1
+            progress = f"[{processed}/{total_event_count}]"
 
-            log.info(f"\n{progress} >> {friendly_name}")
-
-            views, article, url = get_event_pageviews(friendly_name)
+            views, article, url = future.result()
 
             if views is not None:
-                event["wikipedia_views"] = views
-                event["wikipedia_url"] = url
-                modified = True
+                append_journal(journal, json_file, event, article, views, url)
+                if event.get("wikipedia_views") != views or event.get("wikipedia_url") != url:
+                    event["wikipedia_views"] = views
+                    event["wikipedia_url"] = url
+                    modified.add(json_file)
                 successful += 1
-                log.info(f"   -> {article}: {views:,} views/year")
+                log.info(f"{progress} {friendly_name} -> {article}: {views:,} views/year")
             else:
                 failed += 1
-                log.info(f"   -> No data found")
+                log.info(f"{progress} {friendly_name} -> No data found")
 
-            time.sleep(REQUEST_DELAY)
+    elapsed = time.monotonic() - started
 
-        if modified:
-            save_events(json_file, events)
-            log.info(f"\n[SAVED] {json_file.name}")
+    # Compact: one rewrite per changed file, then the journal has nothing left to say.
+    for json_file in json_files:
+        if json_file in modified:
+            catalogue.save(json_file.name)
+            log.info(f"[SAVED] {json_file.name}")
+    JOURNAL_FILE.unlink(missing_ok=True)
 
     # Summary
     log.info("\n" + "=" * 60)
@@ -291,7 +626,11 @@ def process_all_events():
     log.info(f"  Total events: {total_event_count}")
     log.info(f"  Successful:   {successful}")
     log.info(f"  Skipped:      {skipped}")
+    log.info(f"  Resumed:      {len(resumed)}")
     log.info(f"  Failed:       {failed}")
+    log.info(f"  {default_cache().summary()}")
+    if pending:
+        log.info(f"  Elapsed:      {elapsed:,.0f}s ({len(pending) / elapsed * 3600:,.0f} lookups/hour)")
 
 
 def test_sample_events():
@@ -340,8 +679,6 @@ def test_sample_events():
             print(f"  -> No pageview data for '{top_article}'")
             results.append({"event": event_name, "article": top_article, "views": None, "url": url})
 
-        time.sleep(REQUEST_DELAY)
-
     # Summary
     print("\n" + "=" * 60)
     print("SUMMARY (sorted by pageviews)")
@@ -365,6 +702,27 @@ if __name__ == "__main__":
         action="store_true",
         help="Run in test mode with sample events (doesn't modify files)",
     )
+    parser.add_argument(
+        "--monthly",
+        action="store_true",
+        help=f"Count the last {PAGEVIEW_MONTHS} complete months via the monthly endpoint and local store",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Re-count views for events that already have a wikipedia_url (implies --monthly)",
+    )
+    parser.add_argument(
+        "--search-only",
+        action="store_true",
+        help="Skip batch exact-title matching and full-text search every event",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=MAX_WORKERS,
+        help=f"Concurrent lookups (default: {MAX_WORKERS})",
+    )
     args = parser.parse_args()
 
     log = setup_logging()
@@ -372,4 +730,6 @@ if __name__ == "__main__":
     if args.test:
         test_sample_events()
     else:
-        process_all_events()
+        process_all_events(
+            workers=args.workers, monthly=args.monthly, refresh=args.refresh, search_only=args.search_only
+        )
@@ -0,0 +1,366 @@
+"""One load path for public/events, shared by every Python script.
+
+`load()` parses the event files once per process and indexes them by file, name,
+category and year. Scripts read from those indexes and write back through the same
+object, so there is a single serialisation (`json.dumps(indent=2,
+ensure_ascii=False)` plus a trailing newline, which round-trips every file in
+public/events byte for byte; `json_codec` produces it with orjson when that is
+installed) and a single way files are replaced (temp file, fsync, rename).
+
+Which files count: the game loads exactly the files listed in manifest.json, in that
+order. `include_unlisted=True` adds every other *.json in the directory after them
+(candidates.json, deprecated.json, ...) for enrichment scripts that maintain those too.
+
+Events are the parsed dicts themselves, with no bookkeeping keys added, so whatever a
+script changes on them is exactly what gets written. `Transaction` batches edits to
+several files: nothing is written unless every changed file serialises, and an
+exception inside the block undoes the in-memory edits made through it.
+
+Writes are surgical. A shallow copy of every event is kept as loaded; on save, the
+file on disk is indexed into per-event spans (the layout `dumps` produces makes each
+event a run of lines between `  {` and `  }`), and only the lines of fields that
+differ from the loaded copy are rewritten, added or dropped. Everything else is
+carried over byte for byte, so relabelling twenty events costs twenty line edits, not
+a re-serialisation of the file, and the diff can only ever show the fields that
+changed. A file that no longer has that layout, or whose event list grew or shrank,
+is written whole with `dumps` instead. A file changed on disk since it was loaded
+raises `ConflictError` rather than being overwritten with a stale copy.
+
+Parsed files are kept in a pickle snapshot (.cache/event_store.pickle), each entry
+stamped with its file's size and mtime. A file whose stamp still matches is taken from
+the snapshot instead of being parsed; any other file is parsed and the snapshot is
+rewritten. Edits, by these scripts or by hand, change the stamp, so a stale entry is
+never served.
+"""
+
+import bisect
+import json
+import os
+import pickle
+from collections import defaultdict
+from pathlib import Path
+
+import json_codec
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+EVENTS_DIR = PROJECT_ROOT / "public" / "events"
+MANIFEST_FILE = EVENTS_DIR / "manifest.json"
+SNAPSHOT_FILE = PROJECT_ROOT / ".cache" / "event_store.pickle"
+SNAPSHOT_VERSION = 1
+
+_MISSING = object()
+
+
+class ConflictError(Exception):
+    """An event file changed on disk after it was loaded; writing would discard that edit."""
+
+
+def manifest_files() -> list[str]:
+    """The event files the game actually loads, in manifest order."""
+    with open(MANIFEST_FILE, encoding="utf-8") as f:
+        return json.load(f)["files"]
+
+
+def event_files(include_unlisted: bool = False) -> list[str]:
+    """Manifest files, optionally followed by every other event file in name order."""
+    files = manifest_files()
+    if include_unlisted:
+        listed = set(files) | {MANIFEST_FILE.name}
+        files += sorted(p.name for p in EVENTS_DIR.glob("*.json") if p.name not in listed)
+    return files
+
+
+def dumps(events: list) -> str:
+    """The on-disk form of an event file."""
+    return json_codec.dumps(events) + "\n"
+
+
+def _indent(text: str) -> str:
+    return "\n".join("  " + line for line in text.split("\n"))
+
+
+def _event_spans(text: str) -> list[tuple[int, int]] | None:
+    """(start, end) of each event object in a file laid out like `dumps`, else None.
+
+    JSON strings cannot hold a raw newline and nested values sit deeper than two
+    spaces, so a line that is exactly `  {` or `  }` always opens or closes an event.
+    """
+    if text == "[]\n":
+        return []
+    if not text.startswith("[\n"):
+        return None
+    spans = []
+    pos = 2
+    while text.startswith("  {\n", pos):
+        close = text.find("\n  }", pos)
+        if close < 0:
+            return None
+        end = close + 4
+        spans.append((pos, end))
+        if text.startswith(",\n", end):
+            pos = end + 2
+        elif text.endswith("\n]\n") and end == len(text) - 3:
+            return spans
+        else:
+            return None
+    return None
+
+
+_decoder = json.JSONDecoder()
+
+
+def _patch_event(chunk: str, old: dict, new: dict) -> str | None:
+    """`chunk`, the text of `old`, with the lines of fields that differ in `new` rewritten.
+
+    None if the chunk isn't one `"key": value` line per field in `old`'s key order,
+    or a new value would span several lines; the caller then writes the event whole.
+    Lines come out in `new`'s key order, which is where `dumps` would put them: a key
+    popped and set again moves to the end.
+    """
+    fields = {}  # key -> line without its trailing comma, in file order
+    for line in chunk[4:-4].split("\n"):
+        if not line.startswith('    "'):
+            return None
+        try:
+            key, colon = _decoder.raw_decode(line, 4)
+        except json.JSONDecodeError:
+            return None
+        if not line.startswith(": ", colon):
+            return None
+        fields[key] = line[:-1] if line.endswith(",") else line
+    if list(fields) != list(old):
+        return None
+
+    for key in old.keys() - new.keys():
+        del fields[key]
+    for key, value in new.items():
+        if key in old and old[key] == value:
+            continue
+        if isinstance(value, (dict, list)) and value:
+            return None
+        fields[key] = f"    {json.dumps(key, ensure_ascii=False)}: {json.dumps(value, ensure_ascii=False)}"
+    if not new:
+        return "  {}"
+    return "  {\n" + ",\n".join(fields[key] for key in new) + "\n  }"
+
+
+def write_atomic(path: Path, text: str):
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class Catalogue:
+    """Every event, kept in file order, with lookups by name, category and year.
+
+    `files` maps file name to its event list, exactly as parsed. `events` is every
+    event in file order, duplicates included; `unique` drops repeated names, first
+    occurrence winning, which is how the app and its tests build their pool.
+    """
+
+    def __init__(self, files: dict[str, list[dict]]):
+        self.files = files
+        self.events = [event for events in files.values() for event in events]
+        self._file_of = {id(event): filename for filename, events in files.items() for event in events}
+        self.by_name = {}
+        for event in self.events:
+            self.by_name.setdefault(event["name"], event)
+        self.unique = list(self.by_name.values())
+        self.by_category = defaultdict(list)
+        for event in self.unique:
+            self.by_category[event.get("category")].append(event)
+        self._by_year = sorted(self.unique, key=lambda e: e["year"])
+        self._years = [e["year"] for e in self._by_year]
+
+    def file_of(self, event: dict) -> str:
+        return self._file_of[id(event)]
+
+    def playable(self) -> list[dict]:
+        """Unique events with a Cloudinary image: the pool whose quartiles the game sees."""
+        return [e for e in self.unique if "res.cloudinary.com" in (e.get("image_url") or "")]
+
+    def between(self, first_year: int, last_year: int) -> list[dict]:
+        """Unique events with first_year <= year <= last_year, in year order."""
+        lo = bisect.bisect_left(self._years, first_year)
+        hi = bisect.bisect_right(self._years, last_year)
+        return self._by_year[lo:hi]
+
+    def render(self, filename: str) -> str:
+        """The file's new text: the text on disk with changed events patched in.
+
+        Raises ConflictError if the file changed on disk since it was loaded.
+        """
+        events = self.files[filename]
+        baseline = _baselines.get(filename)
+        if baseline is None or baseline[1] is not events:
+            return dumps(events)  # not loaded through `load`, so nothing to patch against
+        stamp, _events, loaded = baseline
+        if _stamp(filename) != stamp:
+            raise ConflictError(f"{filename} changed on disk since it was loaded; reload and redo the edit")
+        if len(loaded) != len(events):
+            return dumps(events)
+        text = (EVENTS_DIR / filename).read_text(encoding="utf-8")
+        spans = _event_spans(text)
+        if spans is None or len(spans) != len(events):
+            return dumps(events)
+
+        pieces = []
+        done = 0
+        for (start, end), old, event in zip(spans, loaded, events):
+            if event == old and list(event) == list(old):  # dict equality ignores key order
+                continue
+            chunk = _patch_event(text[start:end], old, event)
+            if chunk is None:
+                chunk = _indent(json_codec.dumps(event))
+            pieces += [text[done:start], chunk]
+            done = end
+        if not pieces:
+            return text
+        pieces.append(text[done:])
+        return "".join(pieces)
+
+    def save(self, filename: str):
+        """Atomically write one file's in-memory changes to disk."""
+        self._write([(filename, self.render(filename))])
+
+    def _write(self, staged: list[tuple[str, str]]):
+        for filename, text in staged:
+            write_atomic(EVENTS_DIR / filename, text)
+            events = self.files[filename]
+            if filename in _baselines and _baselines[filename][1] is events:
+                _baselines[filename] = (_stamp(filename), events, [dict(e) for e in events])
+
+    def transaction(self, dry_run: bool = False) -> "Transaction":
+        return Transaction(self, dry_run)
+
+
+class Transaction:
+    """Edits to many files, written together when the `with` block exits cleanly.
+
+        with catalogue.transaction() as tx:
+            tx.set(event, difficulty="hard")
+
+    Every changed file is rendered, and checked for conflicting edits on disk, before
+    any is replaced, so a failure part way leaves every file as it was. Each replacement
+    is atomic on its own; a crash between two of them can leave some files written and
+    some not, never a torn file.
+    """
+
+    def __init__(self, catalogue: Catalogue, dry_run: bool = False):
+        self.catalogue = catalogue
+        self.dry_run = dry_run
+        self.changed = defaultdict(int)  # file name -> events changed
+        self._touched = set()
+        self._undo = []
+
+    def set(self, event: dict, **fields) -> bool:
+        """Set fields on an event, returning whether anything actually changed."""
+        changed = False
+        for key, value in fields.items():
+            old = event.get(key, _MISSING)
+            if old == value and old is not _MISSING:
+                continue
+            self._undo.append((event, key, old))
+            event[key] = value
+            changed = True
+        if changed and id(event) not in self._touched:
+            self._touched.add(id(event))
+            self.changed[self.catalogue.file_of(event)] += 1
+        return changed
+
+    def commit(self) -> list[str]:
+        """Write every changed file and return their names (nothing is written on a dry run)."""
+        names = [name for name in self.catalogue.files if self.changed.get(name)]
+        if not self.dry_run:
+            self.catalogue._write([(name, self.catalogue.render(name)) for name in names])
+        self._undo.clear()
+        return names
+
+    def rollback(self):
+        """Undo the in-memory edits made through `set`."""
+        for event, key, old in reversed(self._undo):
+            if old is _MISSING:
+                event.pop(key, None)
+            else:
+                event[key] = old
+        self._undo.clear()
+        self._touched.clear()
+        self.changed.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            try:
+                self.commit()
+            except BaseException:
+                self.rollback()
+                raise
+        else:
+            self.rollback()
+        return False
+
+
+def _stamp(filename: str) -> tuple[int, int]:
+    stat = (EVENTS_DIR / filename).stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _read_snapshot() -> dict:
+    """{file name: (stamp, events)} from the snapshot, or {} if it is missing or unusable."""
+    try:
+        with open(SNAPSHOT_FILE, "rb") as f:
+            version, entries = pickle.load(f)
+    except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+        return {}
+    return entries if version == SNAPSHOT_VERSION else {}
+
+
+def _parse(filenames: list[str]) -> dict[str, tuple[tuple[int, int], list[dict]]]:
+    """{file name: (stamp, events)}, reusing snapshot entries whose stamp still matches."""
+    snapshot = _read_snapshot()
+    files = {}
+    stale = False
+    for filename in filenames:
+        stamp = _stamp(filename)
+        entry = snapshot.get(filename)
+        if entry and entry[0] == stamp:
+            files[filename] = entry
+            continue
+        with open(EVENTS_DIR / filename, "rb") as f:
+            files[filename] = snapshot[filename] = (stamp, json_codec.loads(f.read()))
+        stale = True
+    if stale:
+        try:
+            SNAPSHOT_FILE.parent.mkdir(parents=True, exist_ok=True)
+            tmp = SNAPSHOT_FILE.with_name(f"{SNAPSHOT_FILE.name}.{os.getpid()}.tmp")
+            with open(tmp, "wb") as f:
+                pickle.dump((SNAPSHOT_VERSION, snapshot), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, SNAPSHOT_FILE)
+        except OSError:
+            pass  # the snapshot is only an accelerator
+    return files
+
+
+_parsed = {}  # file name -> event list, shared by every Catalogue in the process
+_baselines = {}  # file name -> (stamp, event list, shallow copies of its events as on disk)
+_loaded = {}
+
+
+def load(include_unlisted: bool = False) -> Catalogue:
+    """The catalogue, parsed on first use and shared for the rest of the process.
+
+    Both views share the same event dicts, so an edit made through one is seen by the
+    other.
+    """
+    if include_unlisted not in _loaded:
+        filenames = event_files(include_unlisted)
+        for filename, (stamp, events) in _parse([name for name in filenames if name not in _parsed]).items():
+            _parsed[filename] = events
+            _baselines[filename] = (stamp, events, [dict(e) for e in events])
+        _loaded[include_unlisted] = Catalogue({name: _parsed[name] for name in filenames})
+    return _loaded[include_unlisted]
@@ -3,43 +3,103 @@
 Extract dominant colors from event images and write them to event JSON files.
 
 Uses a simplified "Okmain" algorithm:
-  1. Download Wikipedia thumbnail
-  2. Resize to 64x64
+  1. Download the event image (Cloudinary, or a Wikipedia thumbnail)
+  2. Decode, resize to 64x64
   3. Convert to Oklab color space
   4. K-means cluster (K=4)
   5. Pick most prominent cluster (pixel count * saturation boost)
   6. Clamp lightness, convert to hex
 
+By default images are fetched from their baked URL and decoded at full resolution.
+`--fast-path` fetches Cloudinary images as the app's existing 400px `thumbnail` rung
+instead, which mints no new derived assets (see docs/cloudinary-cost-controls.md), and
+decodes JPEGs via PIL's draft mode at a scale close to 64x64. That rung is a square
+`g_auto` crop, so a 16:9 image loses its sides, not just resolution.
+`--verify-fast-path N` measures the resulting colour shift in Oklab on real catalogue
+images; the fast path should only become the default once that passes.
+
+Results are cached by image content hash plus every parameter that affects the colour
+(.cache/event_colors.sqlite). A rerun, even with --force, only clusters images whose
+bytes or parameters changed; combined with the HTTP cache's revalidation, `--force` is
+the cheap way to pick up replaced images.
+
+Downloads run concurrently, one small thread pool per host, each paced by its own
+token bucket: Wikimedia gets one request every few seconds, Cloudinary (which serves
+almost every image now) gets many per second. Wall-clock is bounded by the slowest
+host's quota rather than a global sleep after every image.
+
+Extraction is CPU-bound, so it runs in a process pool fed from a bounded queue of
+finished downloads, up to EXTRACT_BATCH_SIZE images per task clustered together by
+`kmeans_batch`: decoding and clustering overlap the network and scale with cores,
+while the queue keeps memory flat however far downloads get ahead. Results come back
+to the main process, which alone writes each event file once its last event is done.
+
 Dependencies: pip install Pillow numpy requests
-Usage: python scripts/extract_event_colors.py [--force] [--category NAME] [--dry-run] [--sample N]
+Usage: python scripts/extract_event_colors.py [--force] [--category NAME] [--dry-run] [--sample N] [--jobs N]
+                                             [--fast-path] [--verify-fast-path N]
 """
 
 import argparse
+import hashlib
 import json
+import os
+import queue
+import re
+import sqlite3
 import sys
-import time
+import threading
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from io import BytesIO
 from pathlib import Path
+from urllib.parse import urlparse
 
 import numpy as np
 import requests
 from PIL import Image
 
-EVENTS_DIR = Path(__file__).parent.parent / "public" / "events"
-MANIFEST_FILE = EVENTS_DIR / "manifest.json"
+import event_store
+from http_cache import default_cache
+from ratelimit import TokenBucket, retry_after_seconds
+
+COLOR_CACHE_FILE = Path(__file__).parent.parent / ".cache" / "event_colors.sqlite"
 
 DOWNSAMPLE_SIZE = 64
 K_CLUSTERS = 4
 KMEANS_MAX_ITER = 20
-RATE_LIMIT_S = 10  # 10s between downloads (Wikipedia rate limits aggressively)
 MAX_RETRIES = 5
 RETRY_BACKOFF_S = 30  # Base backoff for 429 retries (doubles each retry)
+IMAGE_CACHE_TTL = 30 * 24 * 3600  # Revalidated by ETag/Last-Modified once expired
+
+# Per-host (requests/second, concurrent downloads). Wikipedia rate limits aggressively;
+# Cloudinary is our own CDN and only our bandwidth plan limits it.
+HOST_LIMITS = {
+    "upload.wikimedia.org": (0.1, 1),
+    "res.cloudinary.com": (20.0, 16),
+}
+DEFAULT_HOST_LIMIT = (1.0, 2)
+
+DOWNLOAD_QUEUE_SIZE = 64  # Downloaded images waiting for an extraction worker
+EXTRACT_BATCH_SIZE = 32  # Images clustered together by kmeans_batch in one task
 
 MIN_LIGHTNESS = 0.25
 MAX_LIGHTNESS = 0.75
 SATURATION_WEIGHT = 0.5
 TEXT_COLOR_THRESHOLD = 0.6  # Oklab L above this -> dark text
 
+# Mirrors the `thumbnail` rung in src/utils/cloudinaryImage.ts. Do not invent a smaller
+# rung here: each new transform is ~13,000 billable derived assets across the catalogue.
+CLOUDINARY_UPLOAD_MARKER = "/image/upload/"
+CLOUDINARY_THUMBNAIL = "c_fill,f_auto,g_auto,h_400,q_auto:good,w_400"
+CLOUDINARY_TRANSFORM_TOKEN = re.compile(r"^(c_|q_|f_|w_|h_|g_|dpr_)")
+
+# Fast-path acceptance, as Oklab distance from the full-resolution colour: the median
+# must be within a just-noticeable difference, and the 95th percentile within a small
+# shift. A near-tie between two clusters can flip the winner under any resampling, so a
+# few outliers are tolerated (and listed), but a heavy tail fails.
+FAST_PATH_MEDIAN_DELTA_E = 0.02
+FAST_PATH_P95_DELTA_E = 0.05
+
 USER_AGENT = "Mozilla/5.0 (compatible; WhenTimelineGame/1.0; image-color-extraction)"
 
 
@@ -143,12 +203,68 @@ def kmeans(data: np.ndarray, k: int, max_iter: int = KMEANS_MAX_ITER) -> tuple:
     return centers, labels, counts
 
 
+def _batch_sq_dists(data: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    """(B,N,k) squared distances, accumulated a channel at a time.
+
+    Adds the same three terms in the same order as `np.sum(..., axis=2)` in `kmeans`,
+    so the results are bit-identical, without building a (B,N,k,3) temporary.
+    """
+    dists = (data[:, :, None, 0] - centers[:, None, :, 0]) ** 2
+    dists += (data[:, :, None, 1] - centers[:, None, :, 1]) ** 2
+    dists += (data[:, :, None, 2] - centers[:, None, :, 2]) ** 2
+    return dists
+
+
+def kmeans_batch(data: np.ndarray, k: int, max_iter: int = KMEANS_MAX_ITER) -> tuple:
+    """K-means over a stack of B images at once. `data` is (B, N, 3).
+
+    Returns (centers (B,k,3), labels (B,N), counts (B,k)), matching `kmeans` run on
+    each image separately. Seeding stays per image, each with its own seed-42 RNG,
+    so every image draws the same initial centers it would alone; the Lloyd
+    iterations are batched, with centroid sums from one bincount per channel and a
+    per-image mask that freezes an image once it converges.
+    """
+    b, n, _ = data.shape
+    centers = np.stack([kmeans_pp_init(img, k, np.random.default_rng(42)) for img in data])
+    active = np.ones(b, dtype=bool)
+    offsets = (np.arange(b) * k)[:, None]
+
+    for _ in range(max_iter):
+        idx = np.flatnonzero(active)
+        if not len(idx):
+            break
+        sub, sub_centers = data[idx], centers[idx]
+        # Assign
+        flat = (np.argmin(_batch_sq_dists(sub, sub_centers), axis=2) + offsets[:len(idx)]).ravel()
+        # Update
+        size = len(idx) * k
+        counts = np.bincount(flat, minlength=size).reshape(len(idx), k)
+        sums = np.stack(
+            [np.bincount(flat, weights=sub[:, :, c].ravel(), minlength=size) for c in range(3)], axis=1
+        ).reshape(len(idx), k, 3)
+        new_centers = np.where(counts[:, :, None] > 0, sums / np.maximum(counts, 1)[:, :, None], sub_centers)
+        converged = np.all(np.isclose(sub_centers, new_centers, atol=1e-6), axis=(1, 2))
+        centers[idx[~converged]] = new_centers[~converged]
+        active[idx[converged]] = False
+
+    labels = np.argmin(_batch_sq_dists(data, centers), axis=2)
+    counts = np.bincount((labels + offsets).ravel(), minlength=b * k).reshape(b, k)
+    return centers, labels, counts
+
+
 # ── Color extraction ──────────────────────────────────────────────────────
 
-def extract_color(image_bytes: bytes) -> tuple[str, str] | None:
-    """Extract dominant color from image bytes. Returns (hex_color, text_color) or None."""
+def image_to_oklab(image_bytes: bytes, draft: bool = True) -> np.ndarray | None:
+    """Decode and downsample an image to (DOWNSAMPLE_SIZE², 3) Oklab pixels, or None.
+
+    With `draft`, JPEGs are DCT-scaled during decode to the smallest size that is still
+    at least DOWNSAMPLE_SIZE square, so decode cost tracks the target, not the source.
+    """
     try:
-        img = Image.open(BytesIO(image_bytes)).convert("RGB")
+        img = Image.open(BytesIO(image_bytes))
+        if draft and img.format == "JPEG":
+            img.draft("RGB", (DOWNSAMPLE_SIZE, DOWNSAMPLE_SIZE))
+        img = img.convert("RGB")
     except Exception:
         return None
 
@@ -158,12 +274,11 @@ def extract_color(image_bytes: bytes) -> tuple[str, str] | None:
 
     # sRGB -> linear -> Oklab
     linear = srgb_to_linear(pixels)
-    oklab = linear_rgb_to_oklab(linear)
+    return linear_rgb_to_oklab(linear)
 
-    # K-means
-    k = min(K_CLUSTERS, len(oklab))
-    centers, _labels, counts = kmeans(oklab, k)
 
+def pick_color(centers: np.ndarray, counts: np.ndarray) -> tuple[str, str]:
+    """Choose the dominant cluster and render it as (hex_color, text_color)."""
     # Score: pixel_count * (1 + SATURATION_WEIGHT * chroma)
     chroma = np.sqrt(centers[:, 1] ** 2 + centers[:, 2] ** 2)
     scores = counts * (1 + SATURATION_WEIGHT * chroma)
@@ -186,15 +301,124 @@ def extract_color(image_bytes: bytes) -> tuple[str, str] | None:
     return hex_color, text_color
 
 
+def extract_color(image_bytes: bytes, draft: bool = True) -> tuple[str, str] | None:
+    """Extract dominant color from image bytes. Returns (hex_color, text_color) or None."""
+    oklab = image_to_oklab(image_bytes, draft)
+    if oklab is None:
+        return None
+
+    # K-means
+    k = min(K_CLUSTERS, len(oklab))
+    centers, _labels, counts = kmeans(oklab, k)
+    return pick_color(centers, counts)
+
+
+def extract_colors(images: list[bytes], draft: bool = True) -> list[tuple[str, str] | None]:
+    """`extract_color` for many images, clustered together by `kmeans_batch`."""
+    decoded = [image_to_oklab(image_bytes, draft) for image_bytes in images]
+    valid = [i for i, oklab in enumerate(decoded) if oklab is not None]
+    results = [None] * len(images)
+    if valid:
+        centers, _labels, counts = kmeans_batch(np.stack([decoded[i] for i in valid]), K_CLUSTERS)
+        for j, i in enumerate(valid):
+            results[i] = pick_color(centers[j], counts[j])
+    return results
+
+
+def hex_to_oklab(hex_color: str) -> np.ndarray:
+    srgb = np.array([int(hex_color[i:i + 2], 16) for i in (1, 3, 5)], dtype=np.float64) / 255.0
+    return linear_rgb_to_oklab(srgb_to_linear(srgb).reshape(1, 3))[0]
+
+
+def download_url(url: str, fast: bool = True) -> str:
+    """The URL to fetch for colour extraction: the `thumbnail` rung for Cloudinary images.
+
+    Port of `getImageUrl(url, 'thumbnail')`. Non-Cloudinary URLs pass through unchanged.
+    """
+    if not fast or "res.cloudinary.com" not in url or CLOUDINARY_UPLOAD_MARKER not in url:
+        return url
+    left, rest = url.split(CLOUDINARY_UPLOAD_MARKER, 1)
+    first_segment, slash, remainder = rest.partition("/")
+    is_transform = "," in first_segment or CLOUDINARY_TRANSFORM_TOKEN.match(first_segment)
+    public_path = remainder if is_transform and slash else rest
+    return f"{left}{CLOUDINARY_UPLOAD_MARKER}{CLOUDINARY_THUMBNAIL}/{public_path}"
+
+
+def color_params(draft: bool) -> str:
+    """Fingerprint of every setting that can change an extracted colour."""
+    params = {
+        "downsample": DOWNSAMPLE_SIZE,
+        "k": K_CLUSTERS,
+        "max_iter": KMEANS_MAX_ITER,
+        "lightness": [MIN_LIGHTNESS, MAX_LIGHTNESS],
+        "saturation_weight": SATURATION_WEIGHT,
+        "text_threshold": TEXT_COLOR_THRESHOLD,
+        "draft": draft,
+    }
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:16]
+
+
+class ColorCache:
+    """(image content hash, parameters) -> (hex_color, text_color).
+
+    Only the main process touches it; extraction workers never see it.
+    """
+
+    def __init__(self, path: Path = COLOR_CACHE_FILE, draft: bool = True):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.execute("CREATE TABLE IF NOT EXISTS colors (key TEXT PRIMARY KEY, color TEXT, text_color TEXT)")
+        self._db.commit()
+        self.params = color_params(draft)
+        self.hits = 0
+
+    def key(self, image_bytes: bytes) -> str:
+        return f"{hashlib.sha256(image_bytes).hexdigest()}:{self.params}"
+
+    def get(self, key: str) -> tuple[str, str] | None:
+        row = self._db.execute("SELECT color, text_color FROM colors WHERE key = ?", (key,)).fetchone()
+        if row:
+            self.hits += 1
+            return row[0], row[1]
+        return None
+
+    def put(self, key: str, result: tuple[str, str]):
+        self._db.execute("INSERT OR REPLACE INTO colors VALUES (?, ?, ?)", (key, *result))
+        self._db.commit()
+
+
+_host_buckets = {}
+_host_buckets_lock = threading.Lock()
+
+
+def host_bucket(host: str) -> TokenBucket:
+    """The shared rate limiter for one host, created on first use."""
+    with _host_buckets_lock:
+        if host not in _host_buckets:
+            rate, _workers = HOST_LIMITS.get(host, DEFAULT_HOST_LIMIT)
+            _host_buckets[host] = TokenBucket(rate)
+        return _host_buckets[host]
+
+
 def download_image(url: str) -> bytes | None:
-    """Download image with retry on 429. Returns bytes or None on failure."""
+    """Download image with retry on 429. Returns bytes or None on failure.
+
+    Reads through the shared HTTP cache; only requests that reach the network draw on
+    the host's rate budget. A 429 pauses every download from that host.
+    """
+    cached = default_cache().fresh(url)
+    if cached is not None:
+        return cached.content
+
+    bucket = host_bucket(urlparse(url).hostname)
     for attempt in range(MAX_RETRIES + 1):
+        bucket.acquire()
         try:
-            resp = requests.get(url, headers={"User-Agent": USER_AGENT}, timeout=10)
+            resp = default_cache().get(url, headers={"User-Agent": USER_AGENT}, ttl=IMAGE_CACHE_TTL, timeout=10)
             if resp.status_code == 429 and attempt < MAX_RETRIES:
-                wait = RETRY_BACKOFF_S * (2 ** attempt)
-                print(f"  ⏳ Rate limited, waiting {wait:.0f}s (attempt {attempt + 1}/{MAX_RETRIES})...", file=sys.stderr)
-                time.sleep(wait)
+                wait = retry_after_seconds(resp.headers, RETRY_BACKOFF_S * (2 ** attempt))
+                print(f"  ⏳ Rate limited, pausing {urlparse(url).hostname} {wait:.0f}s (attempt {attempt + 1}/{MAX_RETRIES})...", file=sys.stderr)
+                bucket.pause(wait)
                 continue
             resp.raise_for_status()
             return resp.content
@@ -212,83 +436,183 @@ def download_image(url: str) -> bytes | None:
 # ── Main ──────────────────────────────────────────────────────────────────
 
 def process_events(args: argparse.Namespace) -> None:
-    manifest = json.loads(MANIFEST_FILE.read_text())
-    categories = manifest["categories"]
-
-    if args.category:
-        categories = [c for c in categories if c["name"] == args.category]
-        if not categories:
-            print(f"Category '{args.category}' not found in manifest.", file=sys.stderr)
-            sys.exit(1)
+    catalogue = event_store.load()
+    if args.category and args.category not in catalogue.by_category:
+        print(f"Category '{args.category}' not found in the catalogue.", file=sys.stderr)
+        sys.exit(1)
 
     total_processed = 0
     total_skipped = 0
     total_failed = 0
 
-    for cat in categories:
-        for filename in cat["files"]:
-            filepath = EVENTS_DIR / filename
-            if not filepath.exists():
-                print(f"File not found: {filepath}", file=sys.stderr)
+    # Gather work first so downloads for every file can be in flight at once.
+    tasks = []
+    for event in catalogue.events:
+        if args.category and event.get("category") != args.category:
+            continue
+        if not event.get("image_url"):
+            total_skipped += 1
+            continue
+        if event.get("color") and not args.force:
+            total_skipped += 1
+            continue
+        tasks.append((catalogue.file_of(event), event))
+
+    if args.sample:
+        tasks = tasks[:args.sample]
+
+    fast = args.fast_path
+    colors = ColorCache(draft=fast)
+    remaining = Counter(filename for filename, _event in tasks)
+    modified = set()
+
+    def finish(filename):
+        """Single writer: a file is written once, when its last pending event is done."""
+        remaining[filename] -= 1
+        if remaining[filename] == 0 and filename in modified and not args.dry_run:
+            catalogue.save(filename)
+            print(f"  Updated {filename}")
+
+    # Producers: per-host download pools. Blocks when the extractors fall behind.
+    downloaded = queue.Queue(maxsize=DOWNLOAD_QUEUE_SIZE)
+    stop = threading.Event()
+
+    def fetch(filename, event):
+        if stop.is_set():
+            return
+        try:
+            image_bytes = download_image(download_url(event["image_url"], fast))
+        except Exception as e:
+            print(f"  ⚠ Download failed: {e}", file=sys.stderr)
+            image_bytes = None
+        while not stop.is_set():
+            try:
+                downloaded.put((filename, event, image_bytes), timeout=1)
+                return
+            except queue.Full:
                 continue
 
-            events = json.loads(filepath.read_text())
-            modified = False
-
-            for i, event in enumerate(events):
-                if args.sample and total_processed >= args.sample:
-                    break
-
-                name = event.get("friendly_name", event.get("name", "?"))
-                url = event.get("image_url")
+    pools = {}
+    for filename, event in tasks:
+        host = urlparse(event["image_url"]).hostname
+        if host not in pools:
+            _rate, workers = HOST_LIMITS.get(host, DEFAULT_HOST_LIMIT)
+            pools[host] = ThreadPoolExecutor(max_workers=workers)
+        pools[host].submit(fetch, filename, event)
+
+    # Consumer: hand batches of downloads to the process pool, apply results as they land.
+    def apply_result(filename, event, result):
+        nonlocal total_processed, total_failed
+        name = event.get("friendly_name", event.get("name", "?"))
+        if not result:
+            print(f"  ⚠ Could not extract color for: {name}", file=sys.stderr)
+            total_failed += 1
+        else:
+            hex_color, text_color = result
+            if args.dry_run:
+                print(f"  {name}: {hex_color} (text: {text_color})")
+            elif event.get("color") != hex_color or event.get("text_color") != text_color:
+                event["color"] = hex_color
+                event["text_color"] = text_color
+                modified.add(filename)
+            total_processed += 1
+            if total_processed % 50 == 0:
+                print(f"  Processed {total_processed} events...")
+        finish(filename)
+
+    def collect(done, in_flight):
+        for future in done:
+            batch = in_flight.pop(future)
+            for (filename, event, key), result in zip(batch, future.result()):
+                if result:
+                    colors.put(key, result)
+                apply_result(filename, event, result)
 
-                if not url:
-                    total_skipped += 1
-                    continue
-
-                if event.get("color") and not args.force:
-                    total_skipped += 1
-                    continue
-
-                # Download
-                image_bytes = download_image(url)
+    try:
+        with ProcessPoolExecutor(max_workers=args.jobs) as extractors:
+            in_flight = {}
+            buffered = []
+            for i in range(len(tasks)):
+                filename, event, image_bytes = downloaded.get()
                 if not image_bytes:
                     total_failed += 1
-                    continue
-
-                # Extract
-                result = extract_color(image_bytes)
-                if not result:
-                    print(f"  ⚠ Could not extract color for: {name}", file=sys.stderr)
-                    total_failed += 1
-                    continue
-
-                hex_color, text_color = result
-
-                if args.dry_run:
-                    print(f"  {name}: {hex_color} (text: {text_color})")
+                    finish(filename)
                 else:
-                    event["color"] = hex_color
-                    event["text_color"] = text_color
-                    modified = True
-
-                total_processed += 1
-                if total_processed % 50 == 0:
-                    print(f"  Processed {total_processed} events...")
-
-                time.sleep(RATE_LIMIT_S)
-
-            if modified and not args.dry_run:
-                filepath.write_text(json.dumps(events, indent=2, ensure_ascii=False) + "\n")
-                print(f"  Updated {filepath.name}")
-
-            if args.sample and total_processed >= args.sample:
-                break
-
-        if args.sample and total_processed >= args.sample:
-            break
+                    key = colors.key(image_bytes)
+                    cached = colors.get(key)
+                    if cached:
+                        apply_result(filename, event, cached)
+                    else:
+                        buffered.append((filename, event, key, image_bytes))
+                # Ship a batch when it is full, or early when downloads are trickling in.
+                last = i == len(tasks) - 1
+                if buffered and (len(buffered) >= EXTRACT_BATCH_SIZE or downloaded.empty() or last):
+                    future = extractors.submit(extract_colors, [image for *_task, image in buffered], fast)
+                    in_flight[future] = [tuple(task) for *task, _image in buffered]
+                    buffered = []
+                if len(in_flight) >= 2 * args.jobs:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    collect(done, in_flight)
+            collect(list(in_flight), in_flight)
+    finally:
+        # On an early exit, release producers blocked on the full queue.
+        stop.set()
+        for pool in pools.values():
+            pool.shutdown(cancel_futures=True)
 
     print(f"\nDone: {total_processed} extracted, {total_skipped} skipped, {total_failed} failed")
+    print(f"color cache: {colors.hits} reused, {total_processed - colors.hits} clustered")
+    print(default_cache().summary())
+
+
+def verify_fast_path(args: argparse.Namespace) -> int:
+    """Compare fast-path colours with full-resolution extraction on a sample of events.
+
+    Downloads each sampled image twice, as the original URL decoded at full resolution
+    and as the `thumbnail` rung with draft decoding, and reports the Oklab distance
+    between the two colours. Fails when the median exceeds FAST_PATH_MEDIAN_DELTA_E or
+    the 95th percentile exceeds FAST_PATH_P95_DELTA_E.
+    """
+    catalogue = event_store.load()
+    events = catalogue.by_category.get(args.category, []) if args.category else catalogue.unique
+    sample = [event for event in events if event.get("image_url")][:args.verify_fast_path]
+
+    deltas = []
+    for event in sample:
+        url = event["image_url"]
+        full_bytes = download_image(url)
+        fast_bytes = download_image(download_url(url))
+        full = extract_color(full_bytes, draft=False) if full_bytes else None
+        fast = extract_color(fast_bytes, draft=True) if fast_bytes else None
+        if not full or not fast:
+            print(f"  ⚠ Skipped {event['name']}: could not extract both colours", file=sys.stderr)
+            continue
+        delta = float(np.linalg.norm(hex_to_oklab(full[0]) - hex_to_oklab(fast[0])))
+        deltas.append(delta)
+        if delta > FAST_PATH_MEDIAN_DELTA_E:
+            print(f"  {event['name']}: {full[0]} -> {fast[0]} (ΔE {delta:.3f})")
+
+    if not deltas:
+        print("No images could be compared.", file=sys.stderr)
+        return 1
+    median = float(np.median(deltas))
+    p95 = float(np.percentile(deltas, 95))
+    outliers = sum(d > FAST_PATH_MEDIAN_DELTA_E for d in deltas)
+    print(
+        f"\nCompared {len(deltas)} images: median ΔE {median:.4f}, p95 {p95:.4f}, "
+        f"max {max(deltas):.4f}, {outliers} above {FAST_PATH_MEDIAN_DELTA_E}"
+    )
+    failed = False
+    if median > FAST_PATH_MEDIAN_DELTA_E:
+        print(f"FAIL  median ΔE above {FAST_PATH_MEDIAN_DELTA_E}")
+        failed = True
+    if p95 > FAST_PATH_P95_DELTA_E:
+        print(f"FAIL  p95 ΔE above {FAST_PATH_P95_DELTA_E}")
+        failed = True
+    if failed:
+        return 1
+    print(f"pass  median ΔE within {FAST_PATH_MEDIAN_DELTA_E}, p95 within {FAST_PATH_P95_DELTA_E}")
+    return 0
 
 
 def main():
@@ -297,7 +621,12 @@ def main():
     parser.add_argument("--category", type=str, help="Process only this category")
     parser.add_argument("--dry-run", action="store_true", help="Print colors without writing to JSON")
     parser.add_argument("--sample", type=int, help="Process only first N events")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Extraction processes (default: CPU count)")
+    parser.add_argument("--fast-path", action="store_true", help="Fetch the 400px thumbnail rung and decode in JPEG draft mode")
+    parser.add_argument("--verify-fast-path", type=int, metavar="N", help="Check fast-path colours against full decode on N events")
     args = parser.parse_args()
+    if args.verify_fast_path:
+        sys.exit(verify_fast_path(args))
     process_events(args)
 
 
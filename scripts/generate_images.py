@@ -20,26 +20,66 @@ Usage:
 
   # Generate for specific category only:
   python scripts/generate_images.py --category conflict
+
+  # Tune concurrency and the per-minute request rate:
+  python scripts/generate_images.py --workers 8 --rpm 20
+
+  # Build missing WebP/AVIF variants for already generated images, then exit:
+  python scripts/generate_images.py --variants-only
+
+Images are generated by a small pool of workers. A shared scheduler hands out API calls
+at no more than --rpm per minute and stops at the daily cap, counting calls made by
+earlier runs the same day. A quota error (429 / RESOURCE_EXHAUSTED) pauses every worker
+with a backoff that doubles on each consecutive quota error, and the event goes to the
+back of the queue instead of holding up a worker.
+
+Every result is appended to scripts/image_gen_progress.journal.jsonl and fsynced before
+the worker moves on, and image_gen_progress.json is atomically rewritten from it every
+few images. If a run dies, the next one replays the journal on load, so no paid
+generation is lost and none is repeated.
+
+Completion is tracked by prompt, not just by event name: each image is keyed by a hash
+of its final prompt text plus MODEL and ASPECT_RATIO. An event whose prompt already has
+an image (a duplicate, or a renamed event) gets a copy of it without an API call, and an
+event whose description was edited since its image was made is queued again.
+
+As each image lands it is downscaled into WebP/AVIF variants (see image_variants.py),
+and its measured dimensions and byte sizes are recorded under "images" in the progress
+file for update_event_images.py. `--variants-only` backfills images made before that.
+
+The API sits behind a backend interface (image_backends.py); benchmark_image_generator.py
+drives the same scheduling code against an offline mock to measure it.
 """
 
+import hashlib
 import json
 import os
+import queue
 import sys
-import time
-import base64
+import threading
 import argparse
 from pathlib import Path
 from datetime import datetime, date
 
+import event_store
+from image_backends import GeminiBackend, QuotaExceeded, is_quota_error
+from image_variants import make_variants
+from ratelimit import TokenBucket
+
 # ---------------------------------------------------------------------------
 # Configuration
 # ---------------------------------------------------------------------------
 
 DAILY_LIMIT = 95  # stay a bit under 100 to avoid hitting hard cap
+REQUESTS_PER_MINUTE = 10
+WORKERS = 4
+MAX_ATTEMPTS = 3  # per event, per run; quota errors re-queue the event
+QUOTA_BACKOFF_S = 30  # first pause after a quota error, doubling while they continue
+QUOTA_BACKOFF_MAX_S = 600
 IMAGE_DIR = Path("public/events/images")
 PROGRESS_FILE = Path("scripts/image_gen_progress.json")
-EVENTS_DIR = Path("public/events")
-MANIFEST_FILE = EVENTS_DIR / "manifest.json"
+JOURNAL_FILE = Path("scripts/image_gen_progress.journal.jsonl")
+COMPACT_EVERY = 10  # results between atomic rewrites of PROGRESS_FILE
 ASPECT_RATIO = "16:9"
 MODEL = "gemini-2.0-flash-preview-image-generation"
 
@@ -188,19 +228,120 @@ def build_prompt(event: dict) -> str:
 # Progress tracking
 # ---------------------------------------------------------------------------
 
+def new_run_log(day: str) -> dict:
+    return {
+        "date": day,
+        "started": datetime.now().isoformat(),
+        "attempted": 0,
+        "succeeded": 0,
+        "failed": 0,
+        "quota_errors": 0,
+        "reused": 0,
+    }
+
+
+def prompt_key(prompt: str) -> str:
+    """Identity of a generation request: the exact prompt plus the settings that shape the image."""
+    return hashlib.sha256(f"{MODEL}\n{ASPECT_RATIO}\n{prompt}".encode()).hexdigest()[:16]
+
+
+def set_image(progress: dict, name: str, path: str, key: str, info: dict | None = None):
+    """Point an event at its image and remember which prompt produced it and what it measures."""
+    old = progress["prompt_keys"].get(name)
+    if old and old != key and progress["prompts"].get(old) == path:
+        del progress["prompts"][old]  # that file is about to hold the new prompt's image
+    progress["generated"][name] = path
+    progress["prompt_keys"][name] = key
+    progress["prompts"].setdefault(key, path)
+    if info:
+        progress["images"][name] = info
+    else:
+        progress["images"].pop(name, None)  # whatever was measured before is for an old file
+
+
+def apply_record(progress: dict, run_log: dict, record: dict):
+    """Fold one journal record into the progress maps and the run log it belongs to.
+
+    Every record but `reused` and `images` is one API call. `quota_error` records carry
+    a `message` only when the event has used up its attempts. `images` records follow a
+    `generated` or `reused` one once its variants are built.
+    """
+    name = record["name"]
+    if record["type"] == "images":
+        progress["images"][name] = record["image"]
+        return
+    if record["type"] == "reused":
+        set_image(progress, name, record["path"], record["prompt_key"])
+        run_log["reused"] = run_log.get("reused", 0) + 1
+        return
+    run_log["attempted"] += 1
+    if record["type"] == "generated":
+        set_image(progress, name, record["path"], record["prompt_key"])
+        run_log["succeeded"] += 1
+        return
+    if record["type"] == "quota_error":
+        run_log["quota_errors"] += 1
+        if not record.get("message"):
+            return
+    progress["errors"][name] = record["message"]
+    run_log["failed"] += 1
+
+
 def load_progress() -> dict:
-    """Load generation progress from disk."""
+    """Load generation progress from disk, replaying any journal a dead run left behind."""
     if PROGRESS_FILE.exists():
         with open(PROGRESS_FILE) as f:
-            return json.load(f)
-    return {"generated": {}, "errors": {}, "runs": []}
-
-
-def save_progress(progress: dict):
-    """Save generation progress to disk."""
+            progress = json.load(f)
+    else:
+        progress = {"generated": {}, "errors": {}, "runs": []}
+    progress.setdefault("prompts", {})  # prompt key -> image path
+    progress.setdefault("prompt_keys", {})  # event name -> prompt key of its image
+    progress.setdefault("images", {})  # event name -> dimensions, byte sizes and variants
+
+    if JOURNAL_FILE.exists():
+        recovered = {}
+        with open(JOURNAL_FILE) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn final line
+                if record["date"] not in recovered:
+                    recovered[record["date"]] = {**new_run_log(record["date"]), "recovered": True}
+                apply_record(progress, recovered[record["date"]], record)
+        if recovered:
+            count = sum(r["attempted"] + r["reused"] for r in recovered.values())
+            print(f"Recovered {count} results from {JOURNAL_FILE}")
+        progress["runs"].extend(recovered.values())
+        save_progress(progress)
+    return progress
+
+
+def append_journal(journal, record: dict):
+    """Durably record one result before anything else happens."""
+    journal.write(json.dumps(record) + "\n")
+    journal.flush()
+    os.fsync(journal.fileno())
+
+
+def save_progress(progress: dict, journal=None):
+    """Atomically replace the progress file, then drop the journal it now covers.
+
+    `journal` is the open journal of a live run, which is emptied rather than removed.
+    The caller must hold off journal appends until this returns.
+    """
     PROGRESS_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(PROGRESS_FILE, "w") as f:
+    tmp = PROGRESS_FILE.with_name(PROGRESS_FILE.name + ".tmp")
+    with open(tmp, "w") as f:
         json.dump(progress, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, PROGRESS_FILE)
+    if journal is not None:
+        journal.seek(0)
+        journal.truncate()
+    else:
+        JOURNAL_FILE.unlink(missing_ok=True)
 
 
 # ---------------------------------------------------------------------------
@@ -208,56 +349,135 @@ def save_progress(progress: dict):
 # ---------------------------------------------------------------------------
 
 def load_all_events(category_filter: str = None) -> list[dict]:
-    """Load all events from the manifest, optionally filtered by category."""
-    with open(MANIFEST_FILE) as f:
-        manifest = json.load(f)
-
-    events = []
-    for cat in manifest["categories"]:
-        if category_filter and cat["name"] != category_filter:
+    """Load all events from the manifest, optionally filtered by category.
+
+    Returns copies, since the generator annotates them with `_`-prefixed keys.
+    """
+    catalogue = event_store.load()
+    events = catalogue.by_category.get(category_filter, []) if category_filter else catalogue.unique
+    return [dict(event) for event in events]
+
+
+def plan_work(events: list[dict], progress: dict) -> dict:
+    """Sort events by what their current prompt needs.
+
+    Returns lists keyed by:
+      pending  events to generate, one per distinct prompt (includes the stale ones)
+      stale    events whose image was made from a prompt that has since changed
+      reuse    events whose prompt already has an image on disk
+      waiting  events sharing a prompt with a pending event; they reuse its image after
+      adopt    events generated before prompts were tracked, assumed current
+    Each event gets its key as `_prompt_key`.
+    """
+    plan = {"pending": [], "stale": [], "reuse": [], "waiting": [], "adopt": []}
+    images = dict(progress["prompts"])
+    needed = []
+    for event in events:
+        key = event["_prompt_key"] = prompt_key(build_prompt(event))
+        name = event["name"]
+        if name not in progress["generated"]:
+            needed.append(event)
             continue
-        for filename in cat["files"]:
-            filepath = EVENTS_DIR / filename
-            with open(filepath) as f:
-                cat_events = json.load(f)
-                for evt in cat_events:
-                    evt["_source_file"] = filename
-                events.extend(cat_events)
-
-    return events
+        recorded = progress["prompt_keys"].get(name)
+        if recorded is None:
+            plan["adopt"].append(event)
+            images.setdefault(key, progress["generated"][name])
+        elif recorded != key:
+            plan["stale"].append(event)
+            needed.append(event)
+
+    queued = set()
+    for event in needed:
+        key = event["_prompt_key"]
+        source = images.get(key)
+        if source and Path(source).exists():
+            plan["reuse"].append(event)
+        elif key in queued:
+            plan["waiting"].append(event)
+        else:
+            queued.add(key)
+            plan["pending"].append(event)
+    return plan
 
 
 # ---------------------------------------------------------------------------
 # Image generation
 # ---------------------------------------------------------------------------
 
-def generate_image(client, prompt: str, event_name: str) -> bytes | None:
-    """Call Gemini API to generate an image. Returns PNG bytes or None."""
-    from google.genai import types
-
+class QuotaScheduler:
+    """Shared gate for every worker: per-minute pacing, a daily cap, adaptive backoff."""
+
+    def __init__(self, per_minute: float, budget: int,
+                 backoff_s: float = QUOTA_BACKOFF_S, backoff_max_s: float = QUOTA_BACKOFF_MAX_S):
+        self.bucket = TokenBucket(per_minute / 60)
+        self.budget = budget
+        self.granted = 0
+        self.initial_backoff_s = backoff_s
+        self.backoff_max_s = backoff_max_s
+        self.backoff_s = backoff_s
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        """Reserve one API call, waiting for the rate limit. False once the cap is spent."""
+        with self._lock:
+            if self.granted >= self.budget:
+                return False
+            self.granted += 1
+        self.bucket.acquire()
+        return True
+
+    def quota_error(self) -> float:
+        """Pause every worker, doubling the pause while quota errors keep coming.
+
+        A refused call produced nothing, so its slot goes back into the daily budget.
+        """
+        with self._lock:
+            self.granted -= 1
+            wait = self.backoff_s
+            self.backoff_s = min(self.backoff_s * 2, self.backoff_max_s)
+        self.bucket.pause(wait)
+        return wait
+
+    def success(self):
+        with self._lock:
+            self.backoff_s = self.initial_backoff_s
+
+
+def generate_image(backend, prompt: str, event_name: str) -> bytes | None:
+    """Ask the backend for an image. Returns PNG bytes or None.
+
+    Raises QuotaExceeded on rate/quota errors so the caller can back off and retry.
+    """
     try:
-        response = client.models.generate_content(
-            model=MODEL,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                response_modalities=["IMAGE"],
-                image_config=types.ImageConfig(
-                    aspect_ratio=ASPECT_RATIO,
-                ),
-            ),
-        )
-
-        # Extract image from response
-        if response.candidates:
-            for part in response.candidates[0].content.parts:
-                if hasattr(part, "inline_data") and part.inline_data:
-                    return base64.b64decode(part.inline_data.data)
+        image_bytes = backend.generate(prompt)
+        if image_bytes is None:
+            print(f"  ⚠ No image in response for {event_name}")
+        return image_bytes
 
-        print(f"  ⚠ No image in response for {event_name}")
+    except Exception as e:
+        if is_quota_error(e):
+            raise QuotaExceeded(str(e)) from e
+        print(f"  ✗ Error generating {event_name}: {e}")
         return None
 
+
+def reuse_image(progress: dict, event: dict) -> dict:
+    """Copy the image already generated for this event's prompt. Returns the journal record."""
+    key = event["_prompt_key"]
+    path = save_image(Path(progress["prompts"][key]).read_bytes(), event["name"])
+    return {"type": "reused", "name": event["name"], "path": path, "prompt_key": key}
+
+
+def postprocess(path: str) -> dict | None:
+    """Build the image's variants. A failure here must not cost the paid PNG, so it only warns.
+
+    Only call this once the PNG's own record is journaled: the encode is slow, and a
+    crash before that record would leave a paid image no run knows about.
+    """
+    try:
+        return make_variants(path)
     except Exception as e:
-        print(f"  ✗ Error generating {event_name}: {e}")
+        print(f"  ⚠ Could not build variants for {path}: {e} (rerun with --variants-only)")
         return None
 
 
@@ -266,11 +486,120 @@ def save_image(image_bytes: bytes, event_name: str) -> str:
     IMAGE_DIR.mkdir(parents=True, exist_ok=True)
     filename = f"{event_name}.png"
     filepath = IMAGE_DIR / filename
-    with open(filepath, "wb") as f:
+    tmp = filepath.with_name(filename + ".tmp")
+    with open(tmp, "wb") as f:
         f.write(image_bytes)
+    os.replace(tmp, filepath)
     return str(filepath)
 
 
+def generate_pending(backend, progress: dict, plan: dict, run_log: dict, scheduler: QuotaScheduler, workers: int):
+    """Generate `plan["pending"]` with a pool of workers, then copy images to `plan["waiting"]`.
+
+    Results go through the journal into `progress` and `run_log`; the progress file is
+    compacted along the way and once more at the end. An exception on one event is
+    recorded as that event's error; if results can't be journaled at all, the remaining
+    queue is dropped and RuntimeError is raised.
+    """
+    today = run_log["date"]
+    budget = scheduler.budget
+    work = queue.Queue()
+    for event in plan["pending"][:budget]:
+        work.put((event, 1))
+    lock = threading.Lock()
+    JOURNAL_FILE.parent.mkdir(parents=True, exist_ok=True)
+    journal = open(JOURNAL_FILE, "a")
+    unsaved = 0
+    aborted = threading.Event()
+
+    def record(entry):
+        """Journal a result, apply it, and compact every COMPACT_EVERY results."""
+        nonlocal unsaved
+        entry = {**entry, "date": today}
+        with lock:
+            append_journal(journal, entry)
+            apply_record(progress, run_log, entry)
+            unsaved += 1
+            if unsaved >= COMPACT_EVERY:
+                save_progress(progress, journal)
+                unsaved = 0
+
+    def land(entry):
+        """Record a generated or copied image, then build its variants and record those."""
+        record(entry)
+        info = postprocess(entry["path"])
+        if info:
+            record({"type": "images", "name": entry["name"], "image": info})
+
+    def worker():
+        while True:
+            try:
+                event, attempt = work.get(timeout=1)
+            except queue.Empty:
+                if work.unfinished_tasks == 0:
+                    return
+                continue
+            try:
+                if not aborted.is_set():
+                    run_one(event, attempt)
+            except Exception as e:
+                print(f"  ✗ Error on {event['friendly_name']}: {e}")
+                try:
+                    record({"type": "error", "name": event["name"], "message": f"{type(e).__name__}: {e}"})
+                except Exception:
+                    aborted.set()  # results can't be journaled; drain the queue and stop
+            finally:
+                work.task_done()
+
+    def run_one(event, attempt):
+        name = event["name"]
+        friendly = event["friendly_name"]
+        if not scheduler.acquire():
+            return  # daily cap spent; the event stays pending for tomorrow
+
+        try:
+            image_bytes = generate_image(backend, build_prompt(event), name)
+        except QuotaExceeded:
+            wait = scheduler.quota_error()
+            if attempt < MAX_ATTEMPTS:
+                record({"type": "quota_error", "name": name})
+                print(f"  ⏳ Quota hit on {friendly}, pausing {wait:.0f}s and re-queueing")
+                work.put((event, attempt + 1))
+            else:
+                record({"type": "quota_error", "name": name, "message": f"Quota exceeded on {today}"})
+                print(f"✗ {friendly} — quota exceeded after {attempt} attempts")
+            return
+
+        if image_bytes:
+            scheduler.success()
+            path = save_image(image_bytes, name)
+            land({"type": "generated", "name": name, "path": path, "prompt_key": event["_prompt_key"]})
+            print(f"[{run_log['succeeded'] + run_log['failed']}/{budget}] ✓ {friendly} saved ({len(image_bytes)//1024}KB)")
+        else:
+            record({"type": "error", "name": name, "message": f"Failed on {today}"})
+            print(f"[{run_log['succeeded'] + run_log['failed']}/{budget}] ✗ {friendly} failed")
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    work.join()
+    if aborted.is_set():
+        journal.close()
+        raise RuntimeError(f"Could not write to {JOURNAL_FILE}; stopped. Rerun to resume from what was journaled.")
+
+    # Duplicates of what was just generated get copies
+    for event in plan["waiting"]:
+        if event["_prompt_key"] in progress["prompts"]:
+            land(reuse_image(progress, event))
+
+    # Final compaction: everything is in the progress file, so the journal can go.
+    run_log["finished"] = datetime.now().isoformat()
+    with lock:
+        save_progress(progress, journal)
+    journal.close()
+    JOURNAL_FILE.unlink(missing_ok=True)
+
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
@@ -281,32 +610,47 @@ def main():
     parser.add_argument("--limit", type=int, default=DAILY_LIMIT, help=f"Max images per run (default: {DAILY_LIMIT})")
     parser.add_argument("--category", type=str, default=None, help="Only process this category")
     parser.add_argument("--prompts-file", type=str, default=None, help="Export prompts to JSON file")
+    parser.add_argument("--workers", type=int, default=WORKERS, help=f"Concurrent generations (default: {WORKERS})")
+    parser.add_argument("--rpm", type=float, default=REQUESTS_PER_MINUTE, help=f"API requests per minute (default: {REQUESTS_PER_MINUTE})")
+    parser.add_argument("--variants-only", action="store_true", help="Build missing variants for existing images and exit")
     args = parser.parse_args()
 
     # Load progress
     progress = load_progress()
     generated = progress["generated"]  # event_name -> image_path
-    errors = progress["errors"]  # event_name -> error_message
+
+    if args.variants_only:
+        missing = [n for n, p in generated.items() if n not in progress["images"] and Path(p).exists()]
+        for name in missing:
+            info = postprocess(generated[name])
+            if info:
+                progress["images"][name] = info
+        save_progress(progress)
+        print(f"Built variants for {sum(n in progress['images'] for n in missing)}/{len(missing)} images")
+        return
 
     # Load events
     events = load_all_events(args.category)
     total_events = len(events)
 
-    # Filter to events that still need images
-    pending = [e for e in events if e["name"] not in generated]
-    already_done = total_events - len(pending)
+    # Sort events by whether their current prompt already has an image
+    plan = plan_work(events, progress)
+    pending = plan["pending"]
+    already_done = total_events - len(pending) - len(plan["reuse"]) - len(plan["waiting"])
 
     print(f"{'='*60}")
     print(f"When? Image Generator")
     print(f"{'='*60}")
     print(f"Total events:     {total_events}")
     print(f"Already generated: {already_done}")
+    print(f"Reusable:         {len(plan['reuse']) + len(plan['waiting'])} (same prompt as another image)")
+    print(f"Prompt changed:   {len(plan['stale'])}")
     print(f"Pending:          {len(pending)}")
     print(f"Today's limit:    {args.limit}")
     print(f"Days remaining:   {max(1, len(pending) // args.limit)}")
     print(f"{'='*60}")
 
-    if not pending:
+    if not pending and not plan["reuse"] and not plan["adopt"]:
         print("✓ All events have images! Nothing to do.")
         return
 
@@ -333,6 +677,26 @@ def main():
         print(f"\n... and {len(pending) - 5} more")
         return
 
+    # Reuse what we can before spending quota. The run log is registered up front so
+    # every compaction carries this run's counts so far.
+    for event in plan["adopt"]:
+        set_image(progress, event["name"], generated[event["name"]], event["_prompt_key"])
+    today = date.today().isoformat()
+    run_log = new_run_log(today)
+    progress["runs"].append(run_log)
+    if plan["reuse"]:
+        for event in plan["reuse"]:
+            entry = reuse_image(progress, event)
+            apply_record(progress, run_log, entry)
+            info = postprocess(entry["path"])
+            if info:
+                progress["images"][event["name"]] = info
+        print(f"Reused {len(plan['reuse'])} existing images")
+    if plan["adopt"] or plan["reuse"]:
+        save_progress(progress)
+    if not pending:
+        return
+
     # Initialize Gemini client
     api_key = os.environ.get("GEMINI_API_KEY")
     if not api_key:
@@ -340,56 +704,25 @@ def main():
         print("  Run: export GEMINI_API_KEY='your-key-here'")
         sys.exit(1)
 
-    from google import genai
-    client = genai.Client(api_key=api_key)
-
-    # Generate images
-    batch = pending[:args.limit]
-    run_log = {
-        "date": date.today().isoformat(),
-        "started": datetime.now().isoformat(),
-        "attempted": 0,
-        "succeeded": 0,
-        "failed": 0,
-    }
-
-    print(f"\nGenerating {len(batch)} images...\n")
+    backend = GeminiBackend(api_key, MODEL, ASPECT_RATIO)
 
-    for i, event in enumerate(batch):
-        name = event["name"]
-        friendly = event["friendly_name"]
-        print(f"[{i+1}/{len(batch)}] {friendly}...", end=" ", flush=True)
-
-        prompt = build_prompt(event)
-        run_log["attempted"] += 1
-
-        image_bytes = generate_image(client, prompt, name)
-
-        if image_bytes:
-            path = save_image(image_bytes, name)
-            generated[name] = path
-            run_log["succeeded"] += 1
-            print(f"✓ saved ({len(image_bytes)//1024}KB)")
-        else:
-            errors[name] = f"Failed on {date.today().isoformat()}"
-            run_log["failed"] += 1
-            print("✗ failed")
+    # Generate images. The daily cap counts API calls made by earlier runs today.
+    used_today = sum(
+        r.get("attempted", 0) - r.get("quota_errors", 0) for r in progress["runs"] if r.get("date") == today
+    )
+    budget = max(0, args.limit - used_today)
+    scheduler = QuotaScheduler(args.rpm, budget)
 
-        # Brief pause to be respectful of rate limits
-        if i < len(batch) - 1:
-            time.sleep(2)
+    print(f"\nGenerating up to {budget} images ({used_today} calls already made today), "
+          f"{args.workers} workers at {args.rpm:g}/min...\n")
 
-    # Save progress
-    run_log["finished"] = datetime.now().isoformat()
-    progress["runs"].append(run_log)
-    progress["generated"] = generated
-    progress["errors"] = errors
-    save_progress(progress)
+    generate_pending(backend, progress, plan, run_log, scheduler, args.workers)
 
     # Summary
     print(f"\n{'='*60}")
     print(f"Run complete!")
     print(f"  Generated: {run_log['succeeded']}")
+    print(f"  Reused:    {run_log['reused']}")
     print(f"  Failed:    {run_log['failed']}")
     print(f"  Total done: {len(generated)}/{total_events}")
     remaining = total_events - len(generated)
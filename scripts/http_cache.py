@@ -0,0 +1,190 @@
+"""Persistent on-disk cache for the pipeline scripts' HTTP GETs.
+
+Responses are stored in one SQLite file keyed by URL plus sorted query params. Each
+entry carries a TTL; an expired entry that came with an `ETag` or `Last-Modified` is
+revalidated with a conditional request, so an unchanged upstream costs a 304 rather
+than the whole body. The file is kept under a size cap by evicting the least recently
+used entries.
+
+Environment:
+    WHEN_HTTP_CACHE          cache file (default .cache/http_cache.sqlite)
+    WHEN_HTTP_CACHE_MAX_MB   size cap before eviction (default 512)
+    WHEN_HTTP_OFFLINE=1      never touch the network: serve cached entries regardless
+                             of age, and treat a miss as a connection error
+
+Offline mode is how the scripts are exercised against a stand-in: warm the cache once
+(or point WHEN_HTTP_CACHE at a prepared file) and rerun with no network at all.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_PATH = PROJECT_ROOT / ".cache" / "http_cache.sqlite"
+DEFAULT_MAX_MB = 512
+DEFAULT_TTL = 7 * 24 * 3600
+
+# Only headers a caller could plausibly read back are kept.
+STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+class OfflineMiss(requests.exceptions.ConnectionError):
+    """Raised in offline mode when a request has no cached response."""
+
+
+def cache_key(url: str, params: dict | None = None) -> str:
+    if not params:
+        return url
+    return f"{url}?{urlencode(sorted(params.items()))}"
+
+
+class HttpCache:
+    """Thread-safe SQLite response cache. One instance per process is plenty."""
+
+    def __init__(self, path: Path = DEFAULT_PATH, max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024, offline: bool = False):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._db.commit()
+
+    def _row(self, key: str):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT headers, body, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row:
+                self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+                self._db.commit()
+        if not row:
+            return None
+        return json.loads(row[0]), row[1], row[2]
+
+    def fresh(self, url: str, params: dict | None = None) -> requests.Response | None:
+        """The cached response if it is still inside its TTL (or we are offline), else None."""
+        row = self._row(cache_key(url, params))
+        if row and (self.offline or row[2] > time.time()):
+            self.hits += 1
+            return _as_response(url, row[0], row[1])
+        return None
+
+    def get(self, url: str, params: dict | None = None, headers: dict | None = None, ttl: float = DEFAULT_TTL, **kwargs) -> requests.Response:
+        """Drop-in for `requests.get` that reads through the cache.
+
+        Fresh entries are returned without a request; stale ones are revalidated when
+        they have validators. Non-200 responses pass through uncached, so callers keep
+        their own 429/404 handling. The result's `from_cache` says whether the network
+        was skipped entirely.
+        """
+        key = cache_key(url, params)
+        row = self._row(key)
+        if row and (self.offline or row[2] > time.time()):
+            self.hits += 1
+            return _as_response(url, row[0], row[1])
+        if self.offline:
+            raise OfflineMiss(f"offline and not cached: {key}")
+
+        headers = dict(headers or {})
+        if row:
+            stored = CaseInsensitiveDict(row[0])
+            if stored.get("ETag"):
+                headers["If-None-Match"] = stored["ETag"]
+            if stored.get("Last-Modified"):
+                headers["If-Modified-Since"] = stored["Last-Modified"]
+
+        response = requests.get(url, params=params, headers=headers, **kwargs)
+
+        if response.status_code == 304 and row:
+            self.revalidated += 1
+            stored = dict(row[0])
+            for name in STORED_HEADERS:
+                if name in response.headers:
+                    stored[name] = response.headers[name]
+            self._store(key, stored, row[1], ttl)
+            response = _as_response(url, stored, row[1])
+            response.from_cache = False
+            return response
+
+        self.misses += 1
+        response.from_cache = False
+        if response.status_code == 200:
+            stored = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+            self._store(key, stored, response.content, ttl)
+        return response
+
+    def _store(self, key: str, headers: dict, body: bytes, ttl: float):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, json.dumps(headers), body, len(body), now + ttl, now),
+            )
+            self._db.commit()
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache is back under 90% of its cap."""
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * 0.9
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            if total <= target:
+                break
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+        self._db.commit()
+
+    def summary(self) -> str:
+        return f"http cache: {self.hits} hits, {self.revalidated} revalidated, {self.misses} fetched"
+
+
+def _as_response(url: str, headers: dict, body: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response.headers = CaseInsensitiveDict(headers)
+    response._content = body
+    response.from_cache = True
+    return response
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_cache() -> HttpCache:
+    """The process-wide cache, configured from the environment on first use."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = HttpCache(
+                path=Path(os.environ.get("WHEN_HTTP_CACHE", DEFAULT_PATH)),
+                max_bytes=int(float(os.environ.get("WHEN_HTTP_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024),
+                offline=os.environ.get("WHEN_HTTP_OFFLINE") == "1",
+            )
+        return _default
@@ -0,0 +1,125 @@
+"""Image generation backends for generate_images.py.
+
+A backend is any object with a `name` and a `generate(prompt) -> bytes | None` method
+that returns PNG bytes, returns None when the response held no image, and raises on
+failure. Quota refusals should look like the real API's (an exception with
+`code == 429` or RESOURCE_EXHAUSTED in its message) so `is_quota_error` spots them.
+
+`GeminiBackend` is the real thing. `MockBackend` is a local stand-in with configurable
+latency, failure rate and 429s, including a server-side per-minute limit, so the
+generator's scheduling can be exercised and measured without a key or a network
+(see benchmark_image_generator.py).
+"""
+
+import base64
+import hashlib
+import io
+import random
+import threading
+import time
+from collections import deque
+
+from PIL import Image
+
+
+class QuotaExceeded(Exception):
+    """The API refused a request for quota reasons; worth retrying later."""
+
+
+def is_quota_error(exc: Exception) -> bool:
+    return getattr(exc, "code", None) == 429 or "RESOURCE_EXHAUSTED" in str(exc)
+
+
+class GeminiBackend:
+    name = "gemini"
+
+    def __init__(self, api_key: str, model: str, aspect_ratio: str):
+        from google import genai
+
+        self.client = genai.Client(api_key=api_key)
+        self.model = model
+        self.aspect_ratio = aspect_ratio
+
+    def generate(self, prompt: str) -> bytes | None:
+        from google.genai import types
+
+        response = self.client.models.generate_content(
+            model=self.model,
+            contents=prompt,
+            config=types.GenerateContentConfig(
+                response_modalities=["IMAGE"],
+                image_config=types.ImageConfig(
+                    aspect_ratio=self.aspect_ratio,
+                ),
+            ),
+        )
+
+        # Extract image from response
+        if response.candidates:
+            for part in response.candidates[0].content.parts:
+                if hasattr(part, "inline_data") and part.inline_data:
+                    return base64.b64decode(part.inline_data.data)
+        return None
+
+
+class MockError(Exception):
+    def __init__(self, message: str, code: int):
+        super().__init__(message)
+        self.code = code
+
+
+class MockBackend:
+    """Offline stand-in returning a flat-coloured PNG per prompt.
+
+    Each call sleeps `latency` seconds, give or take `jitter`. Calls beyond `server_rpm`
+    in any 60-second window are refused with a 429, as are a random `quota_rate`
+    fraction of the rest; a further `error_rate` fraction fail outright. Draws come
+    from one seeded generator, so a run is repeatable up to thread timing.
+    """
+
+    name = "mock"
+
+    def __init__(self, latency: float = 2.0, jitter: float = 0.5, error_rate: float = 0.0,
+                 quota_rate: float = 0.0, server_rpm: float | None = None, size=(1024, 576), seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.quota_rate = quota_rate
+        self.server_rpm = server_rpm
+        self.size = size
+        self.calls = 0
+        self.refused = 0
+        self.failed = 0
+        self._accepted = deque()  # monotonic times of calls let through, for server_rpm
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def generate(self, prompt: str) -> bytes | None:
+        with self._lock:
+            self.calls += 1
+            now = time.monotonic()
+            while self._accepted and now - self._accepted[0] >= 60:
+                self._accepted.popleft()
+            over_limit = self.server_rpm is not None and len(self._accepted) >= self.server_rpm
+            roll = self._rng.random()
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            if over_limit or roll < self.quota_rate:
+                self.refused += 1
+                refused = True
+            else:
+                self._accepted.append(now)
+                refused = False
+        if refused:
+            raise MockError("429 RESOURCE_EXHAUSTED (mock)", 429)
+        time.sleep(delay)
+        if roll < self.quota_rate + self.error_rate:
+            with self._lock:
+                self.failed += 1
+            raise MockError("500 INTERNAL (mock)", 500)
+        return self._png(prompt)
+
+    def _png(self, prompt: str) -> bytes:
+        colour = tuple(hashlib.sha256(prompt.encode()).digest()[:3])
+        out = io.BytesIO()
+        Image.new("RGB", self.size, colour).save(out, format="PNG")
+        return out.getvalue()
@@ -0,0 +1,53 @@
+"""Post-processing for generated event images.
+
+Gemini returns full-size PNGs (1024x576 for 16:9, several hundred KB each). The app
+never shows them that large, so each PNG is downscaled to the same widths the app asks
+Cloudinary for (src/utils/cloudinaryImage.ts) and encoded as WebP and, where this
+Pillow build supports it, AVIF. The measured dimensions and byte sizes of the source
+and of every variant are returned for the progress store, so nothing downstream has to
+guess them.
+
+Variants sit next to the PNG as `<name>-<width>.<format>`.
+"""
+
+from pathlib import Path
+
+from PIL import Image, features
+
+# Widths match the app's `thumbnail` and `detail` variants; height follows the aspect.
+VARIANT_WIDTHS = {"thumbnail": 400, "detail": 768}
+ENCODE_OPTIONS = {
+    "webp": {"quality": 80, "method": 6},
+    "avif": {"quality": 55, "speed": 6},
+}
+
+
+def available_formats() -> list[str]:
+    return [fmt for fmt in ENCODE_OPTIONS if features.check(fmt)]
+
+
+def make_variants(path: str | Path) -> dict:
+    """Write every variant of the PNG at `path` and describe the results.
+
+    Returns {"width", "height", "bytes", "variants": {variant: {format: {"path",
+    "width", "height", "bytes"}}}}. A variant wider than the source is skipped.
+    """
+    path = Path(path)
+    formats = available_formats()
+    with Image.open(path) as img:
+        img = img.convert("RGB")
+        info = {"width": img.width, "height": img.height, "bytes": path.stat().st_size, "variants": {}}
+        for variant, width in VARIANT_WIDTHS.items():
+            if width > img.width:
+                continue
+            height = round(img.height * width / img.width)
+            resized = img.resize((width, height), Image.Resampling.LANCZOS)
+            outputs = {}
+            for fmt in formats:
+                out = path.with_name(f"{path.stem}-{width}.{fmt}")
+                tmp = out.with_name(out.name + ".tmp")
+                resized.save(tmp, format=fmt.upper(), **ENCODE_OPTIONS[fmt])
+                tmp.replace(out)
+                outputs[fmt] = {"path": str(out), "width": width, "height": height, "bytes": out.stat().st_size}
+            info["variants"][variant] = outputs
+    return info
@@ -0,0 +1,114 @@
+"""JSON parsing and indent-2 output for the event files, accelerated by orjson if installed.
+
+The event files are written as `json.dumps(obj, indent=2, ensure_ascii=False)`, and
+the scripts promise byte-identical round trips, so a faster codec is only usable where
+its output is provably the same:
+
+- Parsing: orjson either returns exactly what `json.loads` would or refuses the input
+  (NaN literals, integers beyond 64 bits, lone surrogates); a refusal falls back to
+  `json.loads`.
+- Writing: orjson's OPT_INDENT_2 matches the stdlib layout and string escaping, but
+  not every value: floats in exponent form (`1e-7` against `1e-07`), NaN and
+  infinities (written as `null`), non-string keys. `dumps` checks the value first and
+  hands anything holding one of those to `json.dumps`.
+- On import, a calibration object covering every case the event files use is encoded
+  both ways. If a future orjson formats any of it differently, the fast path is off
+  for the process.
+
+orjson is optional (`pip install orjson`); without it, or with
+EVENT_JSON_CODEC=stdlib in the environment, everything goes through `json`. `verify`
+compares the two encoders on a real value; benchmark_json_codec.py runs it over every
+file in public/events.
+"""
+
+import json
+import math
+import os
+
+try:
+    import orjson
+except ImportError:  # optional accelerator
+    orjson = None
+
+_PLAIN_TYPES = (str, int, bool, type(None))
+
+# One of everything the event files hold, plus the escapes a string can need.
+_CALIBRATION = [
+    {
+        "name": "calibration",
+        "year": -4_500_000_000,
+        "description": 'quotes " and \\ slashes / tabs\t newlines\n \r \b \f \x01 \x1f \x7f',
+        "unicode": "Ångström – ‘quoted’ 中文 😀    ",
+        "nothing": None,
+        "flags": [True, False],
+        "empty": [{}, []],
+        "ratio": 0.25,
+        "nested": {"a": [1, {"b": "c"}]},
+    },
+]
+
+
+def _stdlib_dumps(obj) -> str:
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
+
+def _plain(obj) -> bool:
+    """True if orjson would encode `obj` exactly as json.dumps does."""
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        kind = type(value)
+        if kind is dict:
+            if not all(type(key) is str for key in value):
+                return False
+            stack.extend(value.values())
+        elif kind is list:
+            stack.extend(value)
+        elif kind is float:
+            if not math.isfinite(value) or "e" in repr(value):
+                return False
+        elif kind not in _PLAIN_TYPES:
+            return False
+    return True
+
+
+def _orjson_dumps(obj) -> str:
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+
+
+def verify(obj) -> bool:
+    """True if the fast encoder's output for `obj` is byte-identical to json.dumps."""
+    if orjson is None:
+        return True
+    try:
+        return _orjson_dumps(obj) == _stdlib_dumps(obj)
+    except TypeError:  # orjson.JSONEncodeError
+        return False
+
+
+def _choose() -> str:
+    if orjson is None or os.environ.get("EVENT_JSON_CODEC", "").lower() == "stdlib":
+        return "json"
+    return "orjson" if verify(_CALIBRATION) else "json"
+
+
+BACKEND = _choose()
+
+
+def loads(data: bytes | str):
+    if BACKEND == "orjson":
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+def dumps(obj) -> str:
+    """`json.dumps(obj, indent=2, ensure_ascii=False)`, byte for byte."""
+    if BACKEND == "orjson" and _plain(obj):
+        try:
+            return _orjson_dumps(obj)
+        except TypeError:  # orjson.JSONEncodeError, e.g. an int beyond 64 bits
+            pass
+    return _stdlib_dumps(obj)
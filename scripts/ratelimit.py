@@ -0,0 +1,86 @@
+"""Shared request-rate limiting for the network-bound pipeline scripts.
+
+A `TokenBucket` is shared by every worker thread that talks to one upstream, so a
+pool of workers spends the upstream's budget exactly once instead of each worker
+sleeping on its own timer. A 429's `Retry-After` pauses the whole bucket: every
+worker waits it out together, rather than one worker backing off while the others
+keep hammering the same quota.
+"""
+
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilling at `rate` tokens/second, holding at most `capacity`."""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_hour(cls, requests_per_hour: float, burst: float = 1.0) -> "TokenBucket":
+        return cls(requests_per_hour / 3600, burst)
+
+    def _refill(self, now: float):
+        # `_updated` sits in the future while paused; nothing accrues until it passes.
+        if now > self._updated:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until `tokens` are available and take them. Returns seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                else:
+                    wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def set_rate(self, rate: float):
+        """Change the refill rate, e.g. after falling back to a lower quota."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+    def pause(self, seconds: float):
+        """Hold back every caller for `seconds` (a global Retry-After), then resume from empty."""
+        with self._lock:
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens = 0.0
+            self._updated = self._paused_until
+
+    @property
+    def paused_for(self) -> float:
+        """Seconds left on the current pause, 0 when running."""
+        with self._lock:
+            return max(0.0, self._paused_until - time.monotonic())
+
+
+def retry_after_seconds(headers, default: float) -> float:
+    """Parse a `Retry-After` header (delta-seconds or HTTP-date), falling back to `default`."""
+    value = headers.get("Retry-After")
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
@@ -5,6 +5,11 @@ instead of Wikimedia URLs.
 
 Run this after generate_images.py has produced images.
 
+Events point at the image's `detail` WebP variant when generate_images.py built one,
+otherwise at the PNG, with the width and height of whichever file that is. Dimensions
+come from the progress file's "images" entries, or from the file itself for images
+recorded before those existed.
+
 Usage:
   python scripts/update_event_images.py          # Preview changes
   python scripts/update_event_images.py --apply   # Apply changes to JSON files
@@ -14,14 +19,30 @@ import json
 import argparse
 from pathlib import Path
 
-EVENTS_DIR = Path("public/events")
+from PIL import Image
+
+import event_store
+
 IMAGE_DIR = Path("public/events/images")
 PROGRESS_FILE = Path("scripts/image_gen_progress.json")
-MANIFEST_FILE = EVENTS_DIR / "manifest.json"
 
-# Standard dimensions for 16:9 generated images
-GENERATED_WIDTH = 1024
-GENERATED_HEIGHT = 576
+# Variant served to the app, best first; the PNG is the fallback
+PREFERRED_VARIANTS = [("detail", "webp")]
+
+
+def served_image(name: str, info: dict | None) -> tuple[Path, int, int] | None:
+    """The file the app should load for `name`, with its width and height, or None."""
+    for variant, fmt in PREFERRED_VARIANTS:
+        entry = ((info or {}).get("variants") or {}).get(variant, {}).get(fmt)
+        if entry and Path(entry["path"]).exists():
+            return Path(entry["path"]), entry["width"], entry["height"]
+    png = IMAGE_DIR / f"{name}.png"
+    if not png.exists():
+        return None
+    if info:
+        return png, info["width"], info["height"]
+    with Image.open(png) as img:
+        return png, img.width, img.height
 
 
 def main():
@@ -38,47 +59,30 @@ def main():
         progress = json.load(f)
 
     generated = progress.get("generated", {})
+    images = progress.get("images", {})
     print(f"Found {len(generated)} generated images\n")
 
-    # Load manifest
-    with open(MANIFEST_FILE) as f:
-        manifest = json.load(f)
-
-    total_updated = 0
-
-    for cat in manifest["categories"]:
-        for filename in cat["files"]:
-            filepath = EVENTS_DIR / filename
-            with open(filepath) as f:
-                events = json.load(f)
-
-            updated_count = 0
-            for event in events:
-                name = event["name"]
-                image_path = IMAGE_DIR / f"{name}.png"
-
-                if name in generated and image_path.exists():
-                    # Build the relative URL for the web app
-                    new_url = f"/events/images/{name}.png"
-
-                    if event.get("image_url") != new_url:
-                        old_url = event.get("image_url", "none")
-                        event["image_url"] = new_url
-                        event["image_width"] = GENERATED_WIDTH
-                        event["image_height"] = GENERATED_HEIGHT
-                        # Preserve original URL for reference
-                        if "original_image_url" not in event and old_url != "none":
-                            event["original_image_url"] = old_url
-                        updated_count += 1
-
-            if updated_count > 0:
-                print(f"  {filename}: {updated_count} events to update")
-                total_updated += updated_count
-
-                if args.apply:
-                    with open(filepath, "w") as f:
-                        json.dump(events, f, indent=2)
-                    print(f"    ✓ Written to {filepath}")
+    catalogue = event_store.load()
+    with catalogue.transaction(dry_run=not args.apply) as tx:
+        for event in catalogue.events:
+            name = event["name"]
+            served = served_image(name, images.get(name)) if name in generated else None
+            if not served:
+                continue
+            image_path, width, height = served
+            # Build the relative URL for the web app
+            new_url = f"/events/images/{image_path.name}"
+            old_url = event.get("image_url", "none")
+            if tx.set(event, image_url=new_url, image_width=width, image_height=height):
+                # Preserve original URL for reference
+                if "original_image_url" not in event and old_url != "none" and not old_url.startswith("/events/images/"):
+                    tx.set(event, original_image_url=old_url)
+
+    for filename, count in tx.changed.items():
+        print(f"  {filename}: {count} events to update")
+    total_updated = sum(tx.changed.values())
+    if args.apply and total_updated:
+        print(f"    ✓ Written {len(tx.changed)} files to {event_store.EVENTS_DIR}")
 
     print(f"\nTotal: {total_updated} events {'updated' if args.apply else 'would be updated'}")
     if not args.apply and total_updated > 0:
@@ -0,0 +1,106 @@
+import fs from 'fs';
+import path from 'path';
+import { buildDifficultyIndex } from './difficultyScore';
+import { HistoricalEvent } from '../types';
+
+/**
+ * scripts/difficulty/grade/catalogue.py ports buildDifficultyIndex to Python so the
+ * grading tooling can report the bands the game will compute. This is the golden-output
+ * check between the two: `parity.py generate` writes large randomised catalogues and the
+ * Python scores for them, this scores the same catalogues here, writes the TypeScript
+ * output beside them for `parity.py compare`, and fails on any difference in u, density
+ * or band. Scores may differ by an ulp: V8's Math.log1p and the C library's disagree in
+ * the last bit for a handful of inputs, which cannot move a band on its own.
+ *
+ * The fixtures are generated on demand into .cache/difficulty-parity/ (tens of MB), so
+ * without them there is nothing to compare and the suite is skipped.
+ */
+
+const PARITY_DIR = path.join(__dirname, '..', '..', '.cache', 'difficulty-parity');
+const REPEAT = 3;
+const SCORE_TOLERANCE = Number.EPSILON;
+
+/** [u, density, score, band], the layout parity.py writes. */
+type Row = [number, number, number, number];
+
+interface ScorerOutput {
+  case: string;
+  scorer: string;
+  events: number;
+  elapsed_ms: number;
+  metrics: Record<string, Row>;
+}
+
+function readJson<T>(file: string): T {
+  // eslint-disable-next-line security/detect-non-literal-fs-filename -- inside PARITY_DIR
+  return JSON.parse(fs.readFileSync(path.join(PARITY_DIR, file), 'utf8')) as T;
+}
+
+function listCases(): string[] {
+  // eslint-disable-next-line security/detect-non-literal-fs-filename -- fixed directory
+  if (!fs.existsSync(PARITY_DIR)) return [];
+  // eslint-disable-next-line security/detect-non-literal-fs-filename -- fixed directory
+  return fs
+    .readdirSync(PARITY_DIR)
+    .filter((file) => file.endsWith('.catalogue.json'))
+    .map((file) => file.slice(0, -'.catalogue.json'.length))
+    .sort();
+}
+
+/** Score a catalogue, timing the best of REPEAT runs. A fresh array each run dodges the memo. */
+function score(events: HistoricalEvent[]): { metrics: Map<string, Row>; elapsed: number } {
+  let elapsed = Infinity;
+  let index = buildDifficultyIndex([...events]);
+  for (let i = 0; i < REPEAT; i++) {
+    const copy = [...events];
+    const started = performance.now();
+    index = buildDifficultyIndex(copy);
+    elapsed = Math.min(elapsed, performance.now() - started);
+  }
+
+  const metrics = new Map<string, Row>();
+  for (const event of events) {
+    const m = index.get(event);
+    metrics.set(event.name, [m.u, m.density, m.score, m.band]);
+  }
+  return { metrics, elapsed };
+}
+
+const cases = listCases();
+const describeIfFixtures = cases.length ? describe : describe.skip;
+
+describeIfFixtures('difficultyScore.ts and catalogue.py agree', () => {
+  // describe.skip still builds its tests, and it.each rejects an empty table.
+  it.each(cases.length ? cases : ['none'])('on %s', (name) => {
+    const events = readJson<HistoricalEvent[]>(`${name}.catalogue.json`);
+    const { metrics, elapsed } = score(events);
+    const output: ScorerOutput = {
+      case: name,
+      scorer: 'typescript',
+      events: events.length,
+      elapsed_ms: elapsed,
+      metrics: Object.fromEntries(metrics),
+    };
+    // eslint-disable-next-line security/detect-non-literal-fs-filename -- inside PARITY_DIR
+    fs.writeFileSync(
+      path.join(PARITY_DIR, `${name}.typescript.json`),
+      JSON.stringify(output) + '\n'
+    );
+
+    const python = readJson<ScorerOutput>(`${name}.python.json`);
+    const theirRows = Object.entries(python.metrics);
+    const differing = theirRows.filter(([key, theirs]) => {
+      const ours = metrics.get(key);
+      if (!ours) return true;
+      const [u, density, score, band] = ours;
+      return (
+        u !== theirs[0] ||
+        density !== theirs[1] ||
+        band !== theirs[3] ||
+        Math.abs(score - theirs[2]) > SCORE_TOLERANCE
+      );
+    });
+    expect(metrics.size).toBe(theirRows.length);
+    expect(differing.slice(0, 10).map(([key]) => key)).toEqual([]);
+  });
+});